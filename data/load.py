@@ -9,30 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src.config import settings
 from src.pinecone import pinecone_service
-
-def extract_plant_and_condition_from_folder(folder_name: str):
-    """
-    Extract plant name and condition from folder name format: {plant}_{condition/disease_name}
-    Example: 'apple_rust_leaf' -> ('apple', 'rust leaf')
-    """
-    parts = folder_name.split('_')
-    if len(parts) < 2:
-        return "Unknown Plant", "Unknown Condition"
-    
-    plant_name = parts[0].replace('_', ' ').title()
-    condition_parts = parts[1:]
-    
-    # Remove 'leaf' if it's at the end as it's redundant for plant diseases
-    if condition_parts[-1].lower() == 'leaf':
-        condition_parts = condition_parts[:-1]
-    
-    condition = ' '.join(condition_parts).replace('_', ' ').title()
-    
-    # Handle special cases for healthy plants
-    if 'healthy' in condition.lower():
-        condition = 'Healthy'
-    
-    return plant_name, condition
+from src.diagnose.utils import extract_plant_and_condition_from_folder
 
 def get_plant_analysis_with_openai(image_bytes: bytes, plant_name: str, condition: str) -> str:
     """
@@ -99,7 +76,7 @@ def load_image_data_to_pinecone(image_path: str, folder_name: str):
         # Create unique document ID
         doc_id = f"{plant_name.replace(' ', '_').lower()}_{condition.replace(' ', '_').lower()}_{os.path.basename(image_path)}"
 
-        # Add to Pinecone (will automatically use text-embedding-3-small for embeddings)
+        # Add to Pinecone (embedded with the active index's embedding model and dimension)
         pinecone_service.add_disease_info({
             "document": document_content,
             "metadata": metadata,
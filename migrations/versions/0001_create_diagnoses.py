@@ -0,0 +1,41 @@
+"""create diagnoses
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+json_type = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+def upgrade() -> None:
+    op.create_table(
+        "diagnoses",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True, autoincrement=True),
+        sa.Column("image_hash", sa.String(64), nullable=False),
+        sa.Column("object_key", sa.String(512), nullable=True),
+        sa.Column("plant_name", sa.String(255), nullable=True),
+        sa.Column("condition", sa.String(255), nullable=True),
+        sa.Column("result", json_type, nullable=False),
+        sa.Column("stage_timings", json_type, nullable=True),
+        sa.Column("stage_tokens", json_type, nullable=True),
+        sa.Column("total_duration_ms", sa.Float(), nullable=True),
+        sa.Column("total_tokens", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_diagnoses_image_hash_created_at", "diagnoses", ["image_hash", "created_at"])
+    op.create_index("ix_diagnoses_plant_condition_created_at", "diagnoses", ["plant_name", "condition", "created_at"])
+    op.create_index("ix_diagnoses_created_at", "diagnoses", ["created_at"])
+
+def downgrade() -> None:
+    op.drop_index("ix_diagnoses_created_at", table_name="diagnoses")
+    op.drop_index("ix_diagnoses_plant_condition_created_at", table_name="diagnoses")
+    op.drop_index("ix_diagnoses_image_hash_created_at", table_name="diagnoses")
+    op.drop_table("diagnoses")
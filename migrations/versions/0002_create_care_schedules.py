@@ -0,0 +1,63 @@
+"""create care schedules
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "user_plants",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("user_id", sa.String(128), nullable=False),
+        sa.Column("plant_name", sa.String(255), nullable=False),
+        sa.Column("region", sa.String(64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_user_plants_user_id", "user_plants", ["user_id"])
+    op.create_index("ix_user_plants_region", "user_plants", ["region"])
+
+    op.create_table(
+        "care_schedules",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("plant_id", sa.String(64), sa.ForeignKey("user_plants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.String(128), nullable=False),
+        sa.Column("region", sa.String(64), nullable=False),
+        sa.Column("task", sa.String(32), nullable=False),
+        sa.Column("base_interval_days", sa.Float(), nullable=False),
+        sa.Column("interval_days", sa.Float(), nullable=False),
+        sa.Column("last_done_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("next_due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("weather_signature", sa.String(32), nullable=False),
+        sa.UniqueConstraint("plant_id", "task", name="uq_care_schedules_plant_task"),
+    )
+    op.create_index("ix_care_schedules_user_next_due", "care_schedules", ["user_id", "next_due_at"])
+    op.create_index("ix_care_schedules_region_task", "care_schedules", ["region", "task"])
+    op.create_index("ix_care_schedules_next_due", "care_schedules", ["next_due_at"])
+
+    op.create_table(
+        "region_weather",
+        sa.Column("region", sa.String(64), primary_key=True),
+        sa.Column("temperature_c", sa.Float(), nullable=False),
+        sa.Column("humidity", sa.Float(), nullable=False),
+        sa.Column("precipitation_mm", sa.Float(), nullable=False),
+        sa.Column("signature", sa.String(32), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table("region_weather")
+    op.drop_index("ix_care_schedules_next_due", table_name="care_schedules")
+    op.drop_index("ix_care_schedules_region_task", table_name="care_schedules")
+    op.drop_index("ix_care_schedules_user_next_due", table_name="care_schedules")
+    op.drop_table("care_schedules")
+    op.drop_index("ix_user_plants_region", table_name="user_plants")
+    op.drop_index("ix_user_plants_user_id", table_name="user_plants")
+    op.drop_table("user_plants")
@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+from .weather import WeatherConditions
+
+CARE_TASKS = ("Water", "Fertilize")
+
+# Days between waterings and fertilizings in mild weather (18-26 C, 30-70% humidity)
+CARE_PROFILES: Dict[str, Tuple[float, float]] = {
+    "snake plant": (14, 60),
+    "zz plant": (14, 60),
+    "pothos": (7, 30),
+    "spider plant": (7, 30),
+    "cast iron plant": (10, 60),
+    "peace lily": (5, 42),
+    "chinese evergreen": (7, 42),
+    "heartleaf philodendron": (7, 30),
+    "rubber plant": (7, 30),
+    "monstera deliciosa": (7, 30),
+    "fiddle leaf fig": (7, 30),
+    "bird of paradise": (7, 30),
+    "aloe vera": (21, 90),
+    "jade plant": (14, 90),
+    "echeveria": (14, 90),
+    "ponytail palm": (21, 90),
+    "boston fern": (3, 30),
+    "calathea": (5, 30),
+    "maidenhair fern": (3, 30),
+    "string of pearls": (14, 60),
+    "parlor palm": (7, 42),
+    "orchid (phalaenopsis)": (7, 21),
+    "english ivy": (5, 30),
+    "rosemary": (7, 42),
+}
+DEFAULT_CARE_PROFILE = (7, 30)
+
+
+@dataclass(frozen=True)
+class WeatherAdjustment:
+    """Multipliers applied to the base care intervals for one region's weather."""
+    water: float = 1.0
+    fertilize: float = 1.0
+
+    @property
+    def signature(self) -> str:
+        """Changes only when the adjustment does, so small weather swings recompute nothing."""
+        return f"w{self.water:.2f}:f{self.fertilize:.2f}"
+
+    def factor(self, task: str) -> float:
+        return self.water if task == "Water" else self.fertilize
+
+
+def get_care_profile(plant_name: str) -> Dict[str, float]:
+    """
+    Base interval in days for each care task.
+    Example: get_care_profile('Snake Plant') -> {'Water': 14, 'Fertilize': 60}
+    """
+    water, fertilize = CARE_PROFILES.get(plant_name.strip().lower(), DEFAULT_CARE_PROFILE)
+    return {"Water": water, "Fertilize": fertilize}
+
+
+def weather_adjustment(conditions: WeatherConditions) -> WeatherAdjustment:
+    """
+    Map weather to interval multipliers. Conditions are bucketed so the
+    adjustment, and any schedule built on it, only moves on meaningful changes.
+    Heat and dry air shorten the watering interval; cold slows growth and
+    lengthens both; heat waves also postpone fertilizing stressed plants.
+    """
+    temperature = conditions.temperature_c
+    if temperature >= 32:
+        water, fertilize = 0.5, 1.5
+    elif temperature >= 27:
+        water, fertilize = 0.75, 1.0
+    elif temperature >= 18:
+        water, fertilize = 1.0, 1.0
+    elif temperature >= 10:
+        water, fertilize = 1.25, 1.25
+    else:
+        water, fertilize = 1.5, 2.0
+
+    if conditions.humidity < 30:
+        water *= 0.85
+    elif conditions.humidity > 70:
+        water *= 1.15
+    if conditions.precipitation_mm >= 10:
+        # Sustained rain keeps the air, and open windows, damp
+        water *= 1.1
+
+    return WeatherAdjustment(water=round(water, 2), fertilize=round(fertilize, 2))
+
+
+def schedule_for(base_interval_days: float, last_done_at: datetime, adjustment: WeatherAdjustment, task: str) -> Dict:
+    """
+    Weather-adjusted interval and next due time for one care task.
+
+    Returns:
+        Dict: interval_days, next_due_at and weather_signature column values
+    """
+    interval_days = round(base_interval_days * adjustment.factor(task), 2)
+    return {
+        "interval_days": interval_days,
+        "next_due_at": last_done_at + timedelta(days=interval_days),
+        "weather_signature": adjustment.signature,
+    }
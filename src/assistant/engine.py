@@ -0,0 +1,261 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database import SessionLocal
+from .care import CARE_TASKS, WeatherAdjustment, get_care_profile, schedule_for, weather_adjustment
+from .models import CareSchedule, RegionWeather, UserPlant
+from .weather import WeatherConditions, WeatherProvider, weather_provider
+
+
+class CareScheduleEngine:
+    """
+    Computes weather-adjusted watering and fertilizing schedules and keeps
+    their next-due times in the care_schedules table.
+
+    Schedules for a batch of plants are built in one pass and bulk inserted.
+    A weather refresh compares each region's adjustment signature with the
+    stored one and rewrites only the schedules in regions whose adjustment
+    changed; everything else is left untouched.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, provider: WeatherProvider):
+        self._session_factory = session_factory
+        self._provider = provider
+        self._task: Optional[asyncio.Task] = None
+
+    async def _region_adjustments(self, session: AsyncSession, regions: Iterable[str], now: datetime) -> Dict[str, WeatherAdjustment]:
+        """Adjustments from stored weather; regions seen for the first time are fetched and stored."""
+        regions = set(regions)
+        stored = (await session.execute(select(RegionWeather).where(RegionWeather.region.in_(regions)))).scalars().all()
+        adjustments = {row.region: weather_adjustment(_conditions_of(row)) for row in stored}
+
+        missing = sorted(regions - set(adjustments))
+        if missing:
+            conditions = await self._provider.get_conditions(missing)
+            rows = [_weather_row(region, conditions[region], now) for region in missing if region in conditions]
+            # Another request or the refresh loop may store the same region first; keep its row
+            await _insert_weather(session, rows, overwrite=False)
+            stored = (await session.execute(select(RegionWeather).where(RegionWeather.region.in_(missing)))).scalars().all()
+            adjustments.update({row.region: weather_adjustment(_conditions_of(row)) for row in stored})
+            for region in missing:
+                # Regions the provider cannot resolve use the mild-weather intervals
+                adjustments.setdefault(region, WeatherAdjustment())
+        return adjustments
+
+    async def add_plants(self, plants: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Add plants to users' collections and build their care schedules in one batch.
+
+        Args:
+            plants (List[Dict]): Each with user_id, plant_name and region
+            now (Optional[datetime]): Treated as the last watering and fertilizing time
+
+        Returns:
+            List[Dict]: The inserted plant rows, including their generated ids
+        """
+        if not plants:
+            return []
+        now = now or datetime.now(timezone.utc)
+        plant_rows, schedule_rows = [], []
+        async with self._session_factory() as session:
+            adjustments = await self._region_adjustments(session, {plant["region"] for plant in plants}, now)
+            for plant in plants:
+                plant_row = {
+                    "id": f"plant_{uuid.uuid4().hex[:12]}",
+                    "user_id": plant["user_id"],
+                    "plant_name": plant["plant_name"],
+                    "region": plant["region"],
+                    "created_at": now,
+                }
+                plant_rows.append(plant_row)
+                profile = get_care_profile(plant["plant_name"])
+                for task in CARE_TASKS:
+                    schedule_rows.append({
+                        "id": f"{plant_row['id']}:{task.lower()}",
+                        "plant_id": plant_row["id"],
+                        "user_id": plant["user_id"],
+                        "region": plant["region"],
+                        "task": task,
+                        "base_interval_days": profile[task],
+                        "last_done_at": now,
+                        **schedule_for(profile[task], now, adjustments[plant["region"]], task),
+                    })
+            await session.execute(insert(UserPlant), plant_rows)
+            await session.execute(insert(CareSchedule), schedule_rows)
+            await session.commit()
+        return plant_rows
+
+    async def list_plants(self, user_id: str) -> List[UserPlant]:
+        async with self._session_factory() as session:
+            statement = select(UserPlant).where(UserPlant.user_id == user_id).order_by(UserPlant.created_at)
+            return list((await session.execute(statement)).scalars().all())
+
+    async def get_schedule(self, user_id: str, until: Optional[datetime] = None) -> List[Dict]:
+        """
+        A user's care tasks, soonest first, optionally only those due by `until`.
+        Served by ix_care_schedules_user_next_due.
+        """
+        statement = (
+            select(CareSchedule.plant_id, UserPlant.plant_name, CareSchedule.task, CareSchedule.next_due_at)
+            .join(UserPlant, UserPlant.id == CareSchedule.plant_id)
+            .where(CareSchedule.user_id == user_id)
+        )
+        if until is not None:
+            statement = statement.where(CareSchedule.next_due_at <= until)
+        statement = statement.order_by(CareSchedule.next_due_at, UserPlant.plant_name, CareSchedule.task)
+        async with self._session_factory() as session:
+            return [dict(row._mapping) for row in await session.execute(statement)]
+
+    async def complete_task(self, user_id: str, plant_id: str, task: str, done_at: Optional[datetime] = None) -> Optional[Dict]:
+        """
+        Record that a care task was done and move its next due time forward.
+
+        Returns:
+            Optional[Dict]: plant_id, plant_name, task and next_due_at, or None if the plant or task does not exist
+        """
+        done_at = done_at or datetime.now(timezone.utc)
+        statement = (
+            select(CareSchedule, UserPlant.plant_name)
+            .join(UserPlant, UserPlant.id == CareSchedule.plant_id)
+            .where(CareSchedule.plant_id == plant_id, CareSchedule.task == task, CareSchedule.user_id == user_id)
+        )
+        async with self._session_factory() as session:
+            row = (await session.execute(statement)).first()
+            if row is None:
+                return None
+            schedule, plant_name = row
+            # The interval already carries the region's current weather adjustment
+            schedule.last_done_at = done_at
+            schedule.next_due_at = done_at + timedelta(days=schedule.interval_days)
+            await session.commit()
+            return {"plant_id": plant_id, "plant_name": plant_name, "task": task, "next_due_at": schedule.next_due_at}
+
+    async def refresh_weather(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Fetch current weather for every region with plants and recompute only
+        the schedules in regions whose weather adjustment changed.
+
+        Returns:
+            Dict: Number of regions checked, the regions that changed and the number of schedules rewritten
+        """
+        now = now or datetime.now(timezone.utc)
+        async with self._session_factory() as session:
+            regions = list((await session.execute(select(UserPlant.region).distinct())).scalars().all())
+            if not regions:
+                return {"regions": 0, "regions_changed": [], "schedules_updated": 0}
+            conditions = await self._provider.get_conditions(regions)
+            stored = {
+                row.region: row
+                for row in (await session.execute(select(RegionWeather).where(RegionWeather.region.in_(regions)))).scalars()
+            }
+
+            changed: Dict[str, WeatherAdjustment] = {}
+            new_rows = []
+            for region, current in conditions.items():
+                adjustment = weather_adjustment(current)
+                previous = stored.get(region)
+                if previous is None:
+                    new_rows.append(_weather_row(region, current, now))
+                    changed[region] = adjustment
+                    continue
+                if _conditions_of(previous) != current:
+                    previous.temperature_c = current.temperature_c
+                    previous.humidity = current.humidity
+                    previous.precipitation_mm = current.precipitation_mm
+                    previous.updated_at = now
+                if previous.signature != adjustment.signature:
+                    previous.signature = adjustment.signature
+                    changed[region] = adjustment
+            # A region first stored by a concurrent add_plants takes the fresher conditions
+            await _insert_weather(session, new_rows, overwrite=True)
+
+            updated = 0
+            for region, adjustment in changed.items():
+                # Served by ix_care_schedules_region_task
+                statement = select(
+                    CareSchedule.id, CareSchedule.task, CareSchedule.base_interval_days, CareSchedule.last_done_at
+                ).where(CareSchedule.region == region, CareSchedule.weather_signature != adjustment.signature)
+                rows = [
+                    {"id": row.id, **schedule_for(row.base_interval_days, row.last_done_at, adjustment, row.task)}
+                    for row in await session.execute(statement)
+                ]
+                if rows:
+                    # Bulk UPDATE by primary key, one statement per region
+                    await session.execute(update(CareSchedule), rows)
+                    updated += len(rows)
+            await session.commit()
+
+        return {"regions": len(regions), "regions_changed": sorted(changed), "schedules_updated": updated}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, interval: float):
+        """Refresh the weather every `interval` seconds on the running event loop."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, interval: float):
+        while True:
+            try:
+                summary = await self.refresh_weather()
+                if summary["regions_changed"]:
+                    print(f"Weather changed in {', '.join(summary['regions_changed'])}; "
+                          f"updated {summary['schedules_updated']} care schedules")
+            except Exception as e:
+                print(f"Error refreshing weather: {e}")
+            await asyncio.sleep(interval)
+
+
+def _conditions_of(row: RegionWeather) -> WeatherConditions:
+    return WeatherConditions(row.temperature_c, row.humidity, row.precipitation_mm)
+
+
+def _weather_row(region: str, conditions: WeatherConditions, now: datetime) -> Dict:
+    return {
+        "region": region,
+        "temperature_c": conditions.temperature_c,
+        "humidity": conditions.humidity,
+        "precipitation_mm": conditions.precipitation_mm,
+        "signature": weather_adjustment(conditions).signature,
+        "updated_at": now,
+    }
+
+
+async def _insert_weather(session: AsyncSession, rows: List[Dict], overwrite: bool):
+    """Insert region weather rows, skipping or overwriting regions that already exist."""
+    if not rows:
+        return
+    dialect_insert = postgresql.insert if session.bind.dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(RegionWeather).values(rows)
+    if overwrite:
+        columns = ("temperature_c", "humidity", "precipitation_mm", "signature", "updated_at")
+        statement = statement.on_conflict_do_update(
+            index_elements=[RegionWeather.region],
+            set_={column: statement.excluded[column] for column in columns},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[RegionWeather.region])
+    await session.execute(statement)
+
+
+# Initialize the care schedule engine instance
+care_schedule_engine = CareScheduleEngine(session_factory=SessionLocal, provider=weather_provider)
@@ -0,0 +1,53 @@
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index, UniqueConstraint
+from src.database import Base
+
+class UserPlant(Base):
+    __tablename__ = "user_plants"
+
+    id = Column(String(64), primary_key=True)
+    user_id = Column(String(128), nullable=False)
+    plant_name = Column(String(255), nullable=False)
+    # Coarse location used to look up weather, e.g. a city or geohash prefix
+    region = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_plants_user_id", "user_id"),
+        Index("ix_user_plants_region", "region"),
+    )
+
+class CareSchedule(Base):
+    __tablename__ = "care_schedules"
+
+    id = Column(String(64), primary_key=True)
+    plant_id = Column(String(64), ForeignKey("user_plants.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(String(128), nullable=False)
+    region = Column(String(64), nullable=False)
+    task = Column(String(32), nullable=False)
+    # Interval for the plant in mild weather, and the weather-adjusted interval in use
+    base_interval_days = Column(Float, nullable=False)
+    interval_days = Column(Float, nullable=False)
+    last_done_at = Column(DateTime(timezone=True), nullable=False)
+    next_due_at = Column(DateTime(timezone=True), nullable=False)
+    weather_signature = Column(String(32), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("plant_id", "task", name="uq_care_schedules_plant_task"),
+        # A user's upcoming tasks, soonest first
+        Index("ix_care_schedules_user_next_due", "user_id", "next_due_at"),
+        # Incremental recompute touches only one region's rows
+        Index("ix_care_schedules_region_task", "region", "task"),
+        # Due-task scans for reminders
+        Index("ix_care_schedules_next_due", "next_due_at"),
+    )
+
+class RegionWeather(Base):
+    __tablename__ = "region_weather"
+
+    region = Column(String(64), primary_key=True)
+    temperature_c = Column(Float, nullable=False)
+    humidity = Column(Float, nullable=False)
+    precipitation_mm = Column(Float, nullable=False)
+    # Signature of the schedule adjustments these conditions produce
+    signature = Column(String(32), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from fastapi import APIRouter, Query
+from .schemas import Plant, PlantCreate, ScheduleItem, ScheduleResponse, TaskCompletion
+from . import service
+
+router = APIRouter()
+
+@router.post("/plants", response_model=Plant)
+async def add_plant(plant: PlantCreate):
+    """
+    Add a plant to the user's collection and build its care schedule.
+    """
+    return (await service.add_plants([plant]))[0]
+
+@router.post("/plants/batch", response_model=List[Plant])
+async def add_plants(plants: List[PlantCreate]):
+    """
+    Add a whole collection at once; schedules are computed and stored in one batch.
+    """
+    return await service.add_plants(plants)
+
+@router.get("/plants", response_model=List[Plant])
+async def list_plants(user_id: str):
+    """
+    List the user's plant collection.
+    """
+    return await service.list_plants(user_id)
+
+@router.get("/schedule", response_model=ScheduleResponse)
+async def get_schedule(user_id: str, days: Optional[int] = Query(None, ge=0, le=365)):
+    """
+    Weather-adjusted care schedule, soonest first. Pass `days` to limit it to tasks due within that window.
+    """
+    return await service.get_schedule(user_id, days=days)
+
+@router.post("/schedule/complete", response_model=ScheduleItem)
+async def complete_task(completion: TaskCompletion):
+    """
+    Mark a care task as done; returns the task with its next due date.
+    """
+    return await service.complete_task(completion)
@@ -0,0 +1,37 @@
+from datetime import date
+from enum import Enum
+from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from src.config import settings
+
+class CareTask(str, Enum):
+    WATER = "Water"
+    FERTILIZE = "Fertilize"
+
+class PlantCreate(BaseModel):
+    plant_name: str = Field(..., min_length=1, max_length=255)
+    user_id: str = Field(..., min_length=1, max_length=128)
+    # Coarse location used for weather lookups, e.g. a city name
+    region: str = Field(settings.ASSISTANT_DEFAULT_REGION, min_length=1, max_length=64)
+
+class Plant(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    plant_name: str
+    user_id: str
+    region: str
+
+class ScheduleItem(BaseModel):
+    plant_id: str
+    plant_name: str
+    task: CareTask
+    due_date: date
+
+class ScheduleResponse(BaseModel):
+    schedule: List[ScheduleItem]
+
+class TaskCompletion(BaseModel):
+    user_id: str
+    plant_id: str
+    task: CareTask
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from .engine import care_schedule_engine
+from .schemas import Plant, PlantCreate, ScheduleItem, ScheduleResponse, TaskCompletion
+
+async def add_plants(plants: List[PlantCreate]) -> List[Plant]:
+    rows = await care_schedule_engine.add_plants([plant.model_dump() for plant in plants])
+    return [Plant(**row) for row in rows]
+
+async def list_plants(user_id: str) -> List[Plant]:
+    return [Plant.model_validate(plant) for plant in await care_schedule_engine.list_plants(user_id)]
+
+def _schedule_item(row: Dict) -> ScheduleItem:
+    return ScheduleItem(plant_id=row["plant_id"], plant_name=row["plant_name"], task=row["task"], due_date=row["next_due_at"].date())
+
+async def get_schedule(user_id: str, days: Optional[int] = None) -> ScheduleResponse:
+    until = datetime.now(timezone.utc) + timedelta(days=days) if days is not None else None
+    rows = await care_schedule_engine.get_schedule(user_id, until=until)
+    return ScheduleResponse(schedule=[_schedule_item(row) for row in rows])
+
+async def complete_task(completion: TaskCompletion) -> ScheduleItem:
+    row = await care_schedule_engine.complete_task(completion.user_id, completion.plant_id, completion.task.value)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Plant not found in this user's collection")
+    return _schedule_item(row)
@@ -0,0 +1,78 @@
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from src.config import settings
+
+
+@dataclass(frozen=True)
+class WeatherConditions:
+    temperature_c: float
+    humidity: float
+    precipitation_mm: float = 0.0
+
+
+class WeatherProvider(ABC):
+    """
+    Source of current weather per region. Subclass and implement
+    `get_conditions` to plug in a real weather API.
+    """
+
+    @abstractmethod
+    async def get_conditions(self, regions: Sequence[str]) -> Dict[str, WeatherConditions]:
+        """
+        Fetch current conditions for each region.
+
+        Args:
+            regions (Sequence[str]): Region names as stored on the user's plants
+
+        Returns:
+            Dict[str, WeatherConditions]: Conditions per region; regions the provider
+            cannot resolve may be left out and keep their previous schedules
+        """
+
+
+class StubWeatherProvider(WeatherProvider):
+    """
+    Offline provider for development and tests. Every region gets stable,
+    mild conditions derived from its name; `set_conditions` overrides a
+    region, e.g. to simulate a heat wave.
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, WeatherConditions]] = None):
+        self._overrides: Dict[str, WeatherConditions] = dict(overrides or {})
+
+    def set_conditions(self, region: str, conditions: WeatherConditions):
+        self._overrides[region] = conditions
+
+    def clear(self, region: Optional[str] = None):
+        if region is None:
+            self._overrides.clear()
+        else:
+            self._overrides.pop(region, None)
+
+    @staticmethod
+    def baseline(region: str) -> WeatherConditions:
+        """Deterministic mild conditions: 18-23 C and 40-60% humidity."""
+        seed = int.from_bytes(hashlib.sha256(region.encode("utf-8")).digest()[:2], "big")
+        return WeatherConditions(temperature_c=18.0 + seed % 6, humidity=40.0 + (seed >> 4) % 21)
+
+    async def get_conditions(self, regions: Sequence[str]) -> Dict[str, WeatherConditions]:
+        return {region: self._overrides.get(region) or self.baseline(region) for region in regions}
+
+
+WEATHER_PROVIDERS = {
+    "stub": StubWeatherProvider,
+}
+
+
+def get_weather_provider(name: str) -> WeatherProvider:
+    """Create the weather provider configured by WEATHER_PROVIDER."""
+    if name not in WEATHER_PROVIDERS:
+        raise ValueError(f"Unknown weather provider '{name}'. Available: {', '.join(WEATHER_PROVIDERS)}")
+    return WEATHER_PROVIDERS[name]()
+
+
+# Initialize the weather provider instance
+weather_provider = get_weather_provider(settings.WEATHER_PROVIDER)
@@ -2,11 +2,17 @@ from agno.agent import Agent
 from agno.tools.duckduckgo import DuckDuckGoTools
 from src.pinecone import pinecone_service
 from agno.models.openai.chat import OpenAIChat
+from .stages import get_stage_config
+
+def stage_model(stage: str) -> OpenAIChat:
+    """Build the chat model for a stage from its configured model, token limit and temperature."""
+    config = get_stage_config(stage)
+    return OpenAIChat(id=config.model, max_tokens=config.max_tokens, temperature=config.temperature)
 
 master_agent = Agent(
     name="Master Agent",
     role="You are the master orchestrator. Your job is to take a plant image, get a preliminary disease name, delegate tasks to other agents, and synthesize their results. Communicate using clear, concise Markdown.",
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("master")
 )
 
 security_agent = Agent(
@@ -33,33 +39,33 @@ security_agent = Agent(
     
     If uncertain about plant identification, default to allowing processing (is_legal_plant: true) unless you can clearly identify illegal species.""",
     tools=[DuckDuckGoTools()],
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("security")
 )
 
 disease_querier = Agent(
     name="Disease Querier",
     role="You are a specialist in querying a vector database of plant diseases. Given a disease name, you will return relevant information. Communicate using clear, concise Markdown.",
     tools=[pinecone_service.query_disease_info],
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("disease_query")
 )
 
 diagnosis_generator = Agent(
     name="Diagnosis Generator",
     role="""You are a plant disease expert. Your primary goal is to provide a detailed diagnosis based on the provided plant name, condition, image description, and context. You will ONLY provide the diagnosis text, without any additional formatting or action plan. Communicate using clear, concise Markdown.""",
     tools=[DuckDuckGoTools()],
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("diagnosis")
 )
 
 action_plan_generator = Agent(
     name="Action Plan Generator",
     role="""You are a plant care expert. Given a plant name, condition, diagnosis, and additional context, your goal is to provide a clear, step-by-step action plan to help the plant recover or thrive. Communicate using clear, concise Markdown.""",
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("action_plan")
 )
 
 evaluation_agent = Agent(
     name="Evaluation Agent",
     role="""You are a quality control specialist. Your job is to review a diagnosis and action plan for clarity, accuracy, and tone. You will then format the final, user-facing response as clear, readable Markdown text, including the plant name and condition.""",
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("evaluation")
 )
 
 parser_agent = Agent(
@@ -79,6 +85,6 @@ parser_agent = Agent(
 ```
 
 Ensure that each action step has a unique 'id'. If no specific diagnosis or action plan is found, provide empty arrays for 'action_plan' and appropriate default values for other fields.""",
-    model=OpenAIChat(id="GPT-4o-mini")
+    model=stage_model("parser")
 )
 
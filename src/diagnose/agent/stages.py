@@ -0,0 +1,97 @@
+import json
+import math
+from typing import Dict, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from src.config import settings
+
+
+class StageConfig(BaseModel):
+    model: str
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    # Maximum estimated tokens for each long text block (retrieved context, reviewed output,
+    # diagnosis, action plan) pasted into this stage's prompt. None means unbounded.
+    context_budget: Optional[int] = None
+
+
+# Per-stage defaults; every field can be overridden with LLM_STAGE_CONFIG
+DEFAULT_STAGE_CONFIG: Dict[str, Dict] = {
+    "master": {},
+    "image_description": {"max_tokens": 100},
+    "initial_plant_info": {"max_tokens": 100, "temperature": 0.0},
+    "security": {"temperature": 0.0},
+    "disease_query": {},
+    "diagnosis": {"context_budget": 1500},
+    "action_plan": {"context_budget": 1500},
+    "evaluation": {"context_budget": 1500},
+    "parser": {"temperature": 0.0, "context_budget": 1500},
+}
+
+# Rough characters-per-token ratio for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def parse_stage_overrides(raw: str) -> Dict[str, Dict]:
+    """
+    Parse and validate LLM_STAGE_CONFIG. Invalid JSON discards every override;
+    a stage whose values fail validation keeps its defaults. Both are reported
+    once, here, instead of failing startup or every request.
+    """
+    if not raw:
+        return {}
+    try:
+        overrides = json.loads(raw)
+    except ValueError as e:
+        print(f"Error parsing LLM_STAGE_CONFIG, using defaults: {e}")
+        return {}
+    if not isinstance(overrides, dict):
+        print("Error parsing LLM_STAGE_CONFIG, using defaults: expected a JSON object keyed by stage")
+        return {}
+
+    valid = {}
+    for stage, values in overrides.items():
+        try:
+            StageConfig(**{"model": settings.LLM_DEFAULT_MODEL, **DEFAULT_STAGE_CONFIG.get(stage, {}), **values})
+        except (TypeError, ValidationError) as e:
+            print(f"Error in LLM_STAGE_CONFIG for stage '{stage}', using its defaults: {e}")
+            continue
+        valid[stage] = values
+    return valid
+
+
+# Parsed once at import; agents are built from it when their module loads
+STAGE_OVERRIDES = parse_stage_overrides(settings.LLM_STAGE_CONFIG)
+
+
+def get_stage_config(stage: str) -> StageConfig:
+    """
+    Resolve the model, token limit, temperature and context budget for a stage.
+    Example: get_stage_config("parser") -> StageConfig(model='GPT-4o-mini', temperature=0.0, ...)
+    """
+    values = {"model": settings.LLM_DEFAULT_MODEL}
+    values.update(DEFAULT_STAGE_CONFIG.get(stage, {}))
+    values.update(STAGE_OVERRIDES.get(stage, {}))
+    return StageConfig(**values)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without loading a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def fit_to_budget(text: str, budget: Optional[int]) -> str:
+    """
+    Truncate text to roughly `budget` tokens, cutting at a line or word boundary.
+    Text within budget is returned unchanged.
+    """
+    if not text or budget is None or estimate_tokens(text) <= budget:
+        return text
+    limit = budget * CHARS_PER_TOKEN
+    cut = text.rfind("\n", 0, limit)
+    if cut < limit // 2:
+        cut = text.rfind(" ", 0, limit)
+    if cut < limit // 2:
+        cut = limit
+    return text[:cut].rstrip() + " [truncated]"
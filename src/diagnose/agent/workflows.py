@@ -3,17 +3,67 @@
 from agno.workflow import Workflow
 from .agents import master_agent, disease_querier, diagnosis_generator, action_plan_generator, evaluation_agent, parser_agent, security_agent
 from src.diagnose.utils import get_initial_plant_info, get_image_description
+from src.diagnose.knowledge import condition_knowledge_cache
+from src.diagnose.metrics import StageMetrics
+from .stages import get_stage_config, fit_to_budget
+from src.config import settings
+from typing import Optional
 import base64
 import json
 
-def diagnosis_workflow(image_bytes: bytes) -> str:
+def build_condition_knowledge(plant_name: str, condition: str, metrics: Optional[StageMetrics] = None) -> tuple[str, str]:
+    """
+    Build the condition-level knowledge shared by every image of the same
+    plant and condition: the retrieved disease context and a base action plan.
+    """
+    metrics = metrics if metrics is not None else StageMetrics()
+    context = ""
+    # Check if the plant is healthy based on the initial diagnosis
+    if condition.lower() == "healthy":
+        context = "The plant appears to be healthy. No specific disease context is available."
+    else:
+        # Disease querier gets context from Pinecone
+        metrics.record_prompt("disease_query", condition)
+        with metrics.stage("disease_query"):
+            pinecone_results = disease_querier.run(condition)
+        metrics.record_agent_run("disease_query", pinecone_results)
+        if pinecone_results and pinecone_results.content:
+            context = pinecone_results.content
+        else:
+            context = f"No specific information found for '{condition}' in the knowledge base."
+
+    # Action plan generator creates the base action plan for the condition
+    budget = get_stage_config("action_plan").context_budget
+    prompt = (
+        f"Plant Name: {plant_name}\nCondition: {condition}\n"
+        f"Here is some context about the condition: {fit_to_budget(context, budget)}. "
+        f"Please provide a step-by-step action plan to help a plant with this condition. If the plant is healthy, provide general care tips. Communicate in Markdown."
+    )
+    metrics.record_prompt("action_plan", prompt)
+    with metrics.stage("action_plan"):
+        action_plan_run = action_plan_generator.run(prompt)
+    metrics.record_agent_run("action_plan", action_plan_run)
+    base_action_plan = action_plan_run.content
+
+    return context, base_action_plan
+
+def warm_condition_knowledge() -> int:
+    """Pre-build condition knowledge for every condition present in the data directory."""
+    return condition_knowledge_cache.warm(build_condition_knowledge, settings.KNOWLEDGE_CACHE_DATA_DIR)
+
+def diagnosis_workflow(image_bytes: bytes, metrics: Optional[StageMetrics] = None) -> str:
+    metrics = metrics if metrics is not None else StageMetrics()
+
     # 1. Get textual description of the image
-    image_description = get_image_description(image_bytes)
+    with metrics.stage("image_description"):
+        image_description = get_image_description(image_bytes, metrics)
 
     # 2. Security validation - check if image is plant-related and legal
-    security_check = security_agent.run(
-        f"Please validate this image description for plant content and legality: {image_description}"
-    )
+    prompt = f"Please validate this image description for plant content and legality: {image_description}"
+    metrics.record_prompt("security", prompt)
+    with metrics.stage("security"):
+        security_check = security_agent.run(prompt)
+    metrics.record_agent_run("security", security_check)
     
     try:
         security_result = json.loads(security_check.content)
@@ -73,47 +123,58 @@ def diagnosis_workflow(image_bytes: bytes) -> str:
         return json.dumps(error_response)
     
     # 3. Get initial plant info (name and condition) using the utility function
-    initial_plant_info_json = get_initial_plant_info(image_description)
+    with metrics.stage("initial_plant_info"):
+        initial_plant_info_json = get_initial_plant_info(image_description, metrics)
     initial_plant_info = json.loads(initial_plant_info_json)
     plant_name = initial_plant_info.get("plant_name", "Unknown Plant")
     condition = initial_plant_info.get("condition", "Unknown Condition")
 
-    context = ""
-    # Check if the plant is healthy based on the initial diagnosis
-    if condition.lower() == "healthy":
-        context = "The plant appears to be healthy. No specific disease context is available."
-    else:
-        # 4. Disease querier gets context from Pinecone
-        pinecone_results = disease_querier.run(condition)
-        if pinecone_results and pinecone_results.content:
-            context = pinecone_results.content
-        else:
-            context = f"No specific information found for '{condition}' in the knowledge base."
+    # 4. Condition-level context and base action plan, shared across images
+    with metrics.stage("condition_knowledge"):
+        knowledge = condition_knowledge_cache.get_or_build(
+            plant_name, condition,
+            lambda plant, cond: build_condition_knowledge(plant, cond, metrics)
+        )
+    context = knowledge.context
+    action_plan = knowledge.base_action_plan
 
     # 5. Diagnosis generator creates a diagnosis using the image description
-    diagnosis = diagnosis_generator.run(
+    budget = get_stage_config("diagnosis").context_budget
+    prompt = (
         f"Plant Name: {plant_name}\nCondition: {condition}\nImage Description: {image_description}. "
-        f"Here is some context about a potential issue: {context}. "
+        f"Here is some context about a potential issue: {fit_to_budget(context, budget)}. "
         f"Please provide a detailed diagnosis. Do NOT provide an exact action plan. Communicate in Markdown."
-    ).content
-
-    # 6. Action plan generator creates the action plan
-    action_plan = action_plan_generator.run(
-        f"Given the following diagnosis: {diagnosis}. "
-        f"And this context: {context}. "
-        f"Please provide a step-by-step action plan to help the plant. If the plant is healthy, provide general care tips. Communicate in Markdown."
-    ).content
+    )
+    metrics.record_prompt("diagnosis", prompt)
+    with metrics.stage("diagnosis"):
+        diagnosis_run = diagnosis_generator.run(prompt)
+    metrics.record_agent_run("diagnosis", diagnosis_run)
+    diagnosis = diagnosis_run.content
 
-    # 7. Evaluation agent refines the output
-    evaluated_text_output = evaluation_agent.run(
+    # 6. Evaluation agent refines the output
+    budget = get_stage_config("evaluation").context_budget
+    prompt = (
         f"Please review the following diagnosis and action plan for clarity, accuracy, and tone. "
-        f"Plant Name: {plant_name}\nCondition: {condition}\nDiagnosis: {diagnosis}\nAction Plan: {action_plan}"
-    ).content
+        f"Plant Name: {plant_name}\nCondition: {condition}\n"
+        f"Diagnosis: {fit_to_budget(diagnosis, budget)}\nAction Plan: {fit_to_budget(action_plan, budget)}"
+    )
+    metrics.record_prompt("evaluation", prompt)
+    with metrics.stage("evaluation"):
+        evaluation_run = evaluation_agent.run(prompt)
+    metrics.record_agent_run("evaluation", evaluation_run)
+    evaluated_text_output = evaluation_run.content
 
-    # 8. Parser agent formats the output as JSON
-    final_json_output_raw = parser_agent.run(
-        f"Plant Name: {plant_name}\nCondition: {condition}\nDiagnosis: {diagnosis}\nAction Plan: {action_plan}"
-    ).content
+    # 7. Parser agent formats the reviewed output as JSON
+    budget = get_stage_config("parser").context_budget
+    prompt = (
+        f"Plant Name: {plant_name}\nCondition: {condition}\n"
+        f"Reviewed diagnosis and action plan:\n{fit_to_budget(evaluated_text_output, budget)}"
+    )
+    metrics.record_prompt("parser", prompt)
+    with metrics.stage("parser"):
+        parser_run = parser_agent.run(prompt)
+    metrics.record_agent_run("parser", parser_run)
+    final_json_output_raw = parser_run.content
 
     # Extract JSON string from Markdown code block
     if final_json_output_raw.startswith("```json") and final_json_output_raw.endswith("```"):
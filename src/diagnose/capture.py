@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from src.config import settings
+
+
+class RequestCapture:
+    """
+    Appends sanitized /diagnose request records to a rotating JSONL file.
+
+    Records hold only the image hash, object key, sizes, timings and outcome;
+    no image bytes or diagnosis text. Writes are handed to a background
+    listener thread so the request path never waits on file I/O.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._logger: Optional[logging.Logger] = None
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> logging.Logger:
+        with self._lock:
+            if self._logger is not None:
+                return self._logger
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            file_handler = RotatingFileHandler(
+                self.path, maxBytes=self._max_bytes, backupCount=self._backup_count, encoding="utf-8"
+            )
+            file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+            records: queue.Queue = queue.Queue(-1)
+            self._listener = QueueListener(records, file_handler)
+            self._listener.start()
+
+            logger = logging.getLogger(f"willow.capture.{self.path}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(QueueHandler(records))
+            self._logger = logger
+            return logger
+
+    def record(self, record: Dict):
+        """Queue one record to be written as a JSON line."""
+        try:
+            self._ensure_started().info(json.dumps(record, default=str, separators=(",", ":")))
+        except Exception as e:
+            print(f"Error capturing request: {e}")
+
+    def stop(self):
+        """Flush queued records and stop the listener thread."""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+            if self._logger is not None:
+                for handler in list(self._logger.handlers):
+                    self._logger.removeHandler(handler)
+                self._logger = None
+
+
+# Initialize the request capture instance
+request_capture = RequestCapture(
+    path=settings.REQUEST_CAPTURE_PATH,
+    max_bytes=settings.REQUEST_CAPTURE_MAX_BYTES,
+    backup_count=settings.REQUEST_CAPTURE_BACKUP_COUNT,
+)
@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.database import SessionLocal
+from .models import Diagnosis
+
+
+# Queued by stop(); the flush loop writes everything ahead of it, then exits
+_STOP = object()
+
+
+class DiagnosisHistoryWriter:
+    """
+    Buffers diagnosis records and writes them to the database in batches,
+    off the request path.
+
+    Records are flushed when a batch fills up or after the flush interval,
+    whichever comes first. When the queue is full new records are dropped
+    rather than slowing down requests.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000,
+    ):
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def start(self):
+        """Start the background flush loop on the running event loop."""
+        if self.running:
+            return
+        # Unbounded so stop() can always queue its marker; enqueue() enforces max_queue
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop accepting records and wait for the loop to write everything queued,
+        including a batch it is in the middle of collecting or flushing.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._queue.put_nowait(_STOP)
+        await self._task
+        self._task = None
+
+    def enqueue(self, record: Dict) -> bool:
+        """
+        Queue a record for writing. Never blocks.
+
+        Args:
+            record (Dict): Column values for a Diagnosis row
+
+        Returns:
+            bool: False if the writer is not running or the queue is full
+        """
+        if not self.running:
+            return False
+        if self._queue.qsize() >= self._max_queue:
+            self.dropped += 1
+            return False
+        record.setdefault("created_at", datetime.now(timezone.utc))
+        self._queue.put_nowait(record)
+        return True
+
+    def _drain(self, limit: int) -> List:
+        batch = []
+        while len(batch) < limit:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            batch = [first] + (self._drain(self._batch_size - 1) if first is not _STOP else [])
+            if len(batch) < self._batch_size and batch[-1] is not _STOP:
+                # Give a partially filled batch a moment to fill up
+                await asyncio.sleep(min(self._flush_interval, 0.1))
+                batch += self._drain(self._batch_size - len(batch))
+            stop = batch[-1] is _STOP
+            await self._flush([record for record in batch if record is not _STOP])
+            if stop:
+                return
+
+    async def _flush(self, batch: List[Dict]):
+        if not batch:
+            return
+        try:
+            async with self._session_factory() as session:
+                await session.execute(insert(Diagnosis), batch)
+                await session.commit()
+        except Exception as e:
+            print(f"Error writing {len(batch)} diagnosis records: {e}")
+
+
+async def get_latest_by_image_hash(session: AsyncSession, image_hash: str, max_age_seconds: int) -> Optional[Diagnosis]:
+    """
+    Return the most recent diagnosis for an image hash within max_age_seconds.
+    Served by ix_diagnoses_image_hash_created_at.
+    """
+    since = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    statement = (
+        select(Diagnosis)
+        .where(Diagnosis.image_hash == image_hash, Diagnosis.created_at >= since)
+        .order_by(Diagnosis.created_at.desc())
+        .limit(1)
+    )
+    return (await session.execute(statement)).scalars().first()
+
+
+async def list_history(
+    session: AsyncSession,
+    plant_name: Optional[str] = None,
+    condition: Optional[str] = None,
+    limit: int = 50,
+    before: Optional[datetime] = None,
+) -> List[Diagnosis]:
+    """
+    List diagnoses newest first, optionally filtered by plant name and condition.
+    Served by ix_diagnoses_plant_condition_created_at or ix_diagnoses_created_at.
+    Pass the created_at of the last row as `before` to fetch the next page.
+    """
+    statement = select(Diagnosis)
+    if plant_name is not None:
+        statement = statement.where(Diagnosis.plant_name == plant_name)
+    if condition is not None:
+        statement = statement.where(Diagnosis.condition == condition)
+    if before is not None:
+        statement = statement.where(Diagnosis.created_at < before)
+    statement = statement.order_by(Diagnosis.created_at.desc()).limit(limit)
+    return list((await session.execute(statement)).scalars().all())
+
+
+# Initialize the diagnosis history writer instance
+diagnosis_history_writer = DiagnosisHistoryWriter(
+    session_factory=SessionLocal,
+    batch_size=settings.DIAGNOSIS_HISTORY_BATCH_SIZE,
+    flush_interval=settings.DIAGNOSIS_HISTORY_FLUSH_INTERVAL_SECONDS,
+    max_queue=settings.DIAGNOSIS_HISTORY_MAX_QUEUE,
+)
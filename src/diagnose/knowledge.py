@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from src.config import settings
+from src.pinecone import pinecone_service
+from src.singleflight import SingleFlight
+from src.diagnose.utils import extract_plant_and_condition_from_folder
+
+# Builds (context, base_action_plan) for a plant name and condition
+KnowledgeBuilder = Callable[[str, str], Tuple[str, str]]
+
+
+@dataclass
+class ConditionKnowledge:
+    plant_name: str
+    condition: str
+    context: str
+    base_action_plan: str
+    index_version: str
+    created_at: float
+
+
+class ConditionKnowledgeCache:
+    """
+    In-memory cache of condition-level knowledge keyed by (plant_name, condition).
+
+    Entries hold the retrieved disease context and a base action plan, which are
+    the same for every image showing the same condition. The whole cache is
+    dropped when the vector index version changes.
+    """
+
+    def __init__(
+        self,
+        version_provider: Callable[[], str],
+        ttl_seconds: int = 86400,
+        max_entries: int = 512,
+    ):
+        self._version_provider = version_provider
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], ConditionKnowledge]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    @staticmethod
+    def make_key(plant_name: str, condition: str) -> Tuple[str, str]:
+        """
+        Normalize a plant name and condition into a cache key.
+        Example: ('Apple ', 'Rust Leaf') -> ('apple', 'rust')
+        """
+        plant = " ".join(plant_name.lower().split())
+        cond = " ".join(condition.lower().split())
+        if cond.endswith(" leaf"):
+            cond = cond[:-len(" leaf")]
+        return plant, cond
+
+    def _check_version(self, version: str):
+        # Must be called with the lock held; the version is read before taking it,
+        # since the provider may occasionally call out to Pinecone
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, plant_name: str, condition: str) -> Optional[ConditionKnowledge]:
+        key = self.make_key(plant_name, condition)
+        version = self._version_provider()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry.created_at > self._ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, plant_name: str, condition: str, context: str, base_action_plan: str) -> ConditionKnowledge:
+        key = self.make_key(plant_name, condition)
+        version = self._version_provider()
+        with self._lock:
+            self._check_version(version)
+            entry = ConditionKnowledge(
+                plant_name=plant_name,
+                condition=condition,
+                context=context,
+                base_action_plan=base_action_plan,
+                index_version=self._version,
+                created_at=time.time(),
+            )
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def get_or_build(self, plant_name: str, condition: str, builder: KnowledgeBuilder) -> ConditionKnowledge:
+        """
+        Return cached knowledge for the condition, building it on a miss.
+
+        Args:
+            plant_name (str): Plant name as identified from the image
+            condition (str): Condition as identified from the image
+            builder (KnowledgeBuilder): Produces (context, base_action_plan) on a miss
+
+        Returns:
+            ConditionKnowledge: The cached or freshly built entry
+        """
+        entry = self.get(plant_name, condition)
+        if entry is not None:
+            return entry
+        # Concurrent misses for the same condition wait on a single build
+        return self._flight.do(
+            self.make_key(plant_name, condition),
+            self._build, plant_name, condition, builder
+        )
+
+    def _build(self, plant_name: str, condition: str, builder: KnowledgeBuilder) -> ConditionKnowledge:
+        entry = self.get(plant_name, condition)
+        if entry is not None:
+            return entry
+        context, base_action_plan = builder(plant_name, condition)
+        return self.put(plant_name, condition, context, base_action_plan)
+
+    def invalidate(self, plant_name: Optional[str] = None, condition: Optional[str] = None):
+        """Drop one entry, or every entry when no plant name and condition are given."""
+        with self._lock:
+            if plant_name is None or condition is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.make_key(plant_name, condition), None)
+
+    def warm(self, builder: KnowledgeBuilder, data_dir: str) -> int:
+        """
+        Pre-build knowledge for every condition present in the data directory.
+
+        Returns:
+            int: Number of conditions that were built
+        """
+        built = 0
+        for plant_name, condition in list_data_conditions(data_dir):
+            if self.get(plant_name, condition) is not None:
+                continue
+            try:
+                self.get_or_build(plant_name, condition, builder)
+                built += 1
+            except Exception as e:
+                print(f"Error warming knowledge for {plant_name} ({condition}): {e}")
+        return built
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def list_data_conditions(data_dir: str) -> List[Tuple[str, str]]:
+    """
+    List the distinct (plant_name, condition) pairs found in the data directory,
+    using the same folder naming as data/load.py.
+    """
+    if not os.path.isdir(data_dir):
+        return []
+
+    conditions = []
+    seen = set()
+    for folder_name in sorted(os.listdir(data_dir)):
+        if not os.path.isdir(os.path.join(data_dir, folder_name)) or folder_name.startswith('.') or folder_name == '__pycache__':
+            continue
+        plant_name, condition = extract_plant_and_condition_from_folder(folder_name)
+        if plant_name == "Unknown Plant":
+            continue
+        key = ConditionKnowledgeCache.make_key(plant_name, condition)
+        if key not in seen:
+            seen.add(key)
+            conditions.append((plant_name, condition))
+    return conditions
+
+
+# Initialize the condition knowledge cache instance
+condition_knowledge_cache = ConditionKnowledgeCache(
+    version_provider=lambda: pinecone_service.index_version,
+    ttl_seconds=settings.KNOWLEDGE_CACHE_TTL_SECONDS,
+    max_entries=settings.KNOWLEDGE_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from src.diagnose.agent.stages import estimate_tokens
+
+
+class StageMetrics:
+    """
+    Collects wall-clock timings and token usage for each stage of a diagnosis run.
+
+    Timings are stored in milliseconds keyed by stage name. Token usage is stored
+    per stage as {"input": int, "output": int, "total": int, "prompt": int}, where
+    "prompt" is the estimated size of the prompt text we built for the stage.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.tokens: Dict[str, Dict[str, int]] = {}
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed_ms, 2)
+
+    def add_tokens(self, name: str, input_tokens: int = 0, output_tokens: int = 0, total_tokens: Optional[int] = None):
+        usage = self._usage(name)
+        usage["input"] += input_tokens or 0
+        usage["output"] += output_tokens or 0
+        usage["total"] += total_tokens if total_tokens is not None else (input_tokens or 0) + (output_tokens or 0)
+
+    def _usage(self, name: str) -> Dict[str, int]:
+        return self.tokens.setdefault(name, {"input": 0, "output": 0, "total": 0, "prompt": 0})
+
+    def record_prompt(self, name: str, prompt: str):
+        """Record the estimated token size of a prompt built for a stage."""
+        self._usage(name)["prompt"] += estimate_tokens(prompt)
+
+    def record_openai_usage(self, name: str, response: Any):
+        """Record token usage from an OpenAI chat completion response."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        self.add_tokens(
+            name,
+            input_tokens=getattr(usage, "prompt_tokens", 0),
+            output_tokens=getattr(usage, "completion_tokens", 0),
+            total_tokens=getattr(usage, "total_tokens", None),
+        )
+
+    def record_agent_run(self, name: str, run: Any):
+        """Record token usage from an agno agent run."""
+        metrics = getattr(run, "metrics", None)
+        if metrics is None:
+            return
+        self.add_tokens(
+            name,
+            input_tokens=getattr(metrics, "input_tokens", 0),
+            output_tokens=getattr(metrics, "output_tokens", 0),
+            total_tokens=getattr(metrics, "total_tokens", None),
+        )
+
+    def finish(self):
+        """Freeze the total duration at the end of the run."""
+        self._finished = time.perf_counter()
+
+    @property
+    def total_duration_ms(self) -> float:
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return round((end - self._started) * 1000, 2)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(usage["total"] for usage in self.tokens.values())
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, String, Integer, Float, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from src.database import Base
+
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+class Diagnosis(Base):
+    __tablename__ = "diagnoses"
+
+    id = Column(BigInteger().with_variant(Integer(), "sqlite"), primary_key=True, autoincrement=True)
+    image_hash = Column(String(64), nullable=False)
+    object_key = Column(String(512), nullable=True)
+    plant_name = Column(String(255), nullable=True)
+    condition = Column(String(255), nullable=True)
+    result = Column(JSONType, nullable=False)
+    # {"stage_name": milliseconds}
+    stage_timings = Column(JSONType, nullable=True)
+    # {"stage_name": {"input": int, "output": int, "total": int}}
+    stage_tokens = Column(JSONType, nullable=True)
+    total_duration_ms = Column(Float, nullable=True)
+    total_tokens = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Result reuse for identical uploads: latest row for an image hash
+        Index("ix_diagnoses_image_hash_created_at", "image_hash", "created_at"),
+        # History filtered by plant and condition, newest first
+        Index("ix_diagnoses_plant_condition_created_at", "plant_name", "condition", "created_at"),
+        # Unfiltered history, newest first
+        Index("ix_diagnoses_created_at", "created_at"),
+    )
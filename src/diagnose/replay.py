@@ -0,0 +1,218 @@
+"""
+Replay captured /diagnose traffic against a deployment and compare latency between builds.
+
+Captured records (see REQUEST_CAPTURE_ENABLED) hold the MinIO object key of every
+uploaded image and the time it arrived. `run` re-sends those images to a target at
+the original pacing, optionally sped up or slowed down, and writes one result line
+per request. `compare` summarizes two result files side by side.
+
+Usage:
+    python -m src.diagnose.replay run --capture captures/diagnose_requests.jsonl* \\
+        --target http://localhost:8000 --speed 2 --output build_a.jsonl
+    python -m src.diagnose.replay compare build_a.jsonl build_b.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+
+def load_captured_records(paths: List[str], limit: Optional[int] = None) -> List[Dict]:
+    """
+    Load captured records from one or more (possibly rotated) JSONL files,
+    ordered by arrival time.
+    """
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("object_key") and record.get("received_at") is not None:
+                    records.append(record)
+    records.sort(key=lambda record: record["received_at"])
+    return records[:limit] if limit else records
+
+
+def schedule_offsets(records: List[Dict], speed: float = 1.0) -> List[float]:
+    """
+    Seconds after replay start at which each record should be sent.
+    Example: arrivals at t=100, 101, 104 with speed=2 -> [0.0, 0.5, 2.0]
+    """
+    if not records:
+        return []
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    first = records[0]["received_at"]
+    return [(record["received_at"] - first) / speed for record in records]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile with linear interpolation, q in [0, 100]."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """Latency distribution (ms) of successful requests, plus the error rate."""
+    latencies = [result["latency_ms"] for result in results if result.get("status") == 200]
+    errors = len(results) - len(latencies)
+    return {
+        "requests": len(results),
+        "error_rate": errors / len(results) if results else 0.0,
+        "mean": sum(latencies) / len(latencies) if latencies else float("nan"),
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else float("nan"),
+    }
+
+
+def compare(baseline: List[Dict], candidate: List[Dict]) -> Dict[str, Dict]:
+    """
+    Compare two replay result sets.
+
+    Returns:
+        Dict[str, Dict]: For each metric, the baseline and candidate values and the relative change
+    """
+    a, b = summarize(baseline), summarize(candidate)
+    comparison = {}
+    for metric in a:
+        change = (b[metric] - a[metric]) / a[metric] if a[metric] else float("nan")
+        comparison[metric] = {"baseline": a[metric], "candidate": b[metric], "change": change}
+    return comparison
+
+
+def fetch_images(records: List[Dict]) -> Dict[str, bytes]:
+    """Download each distinct captured image from MinIO once, before replay starts."""
+    # Imported here so `compare` works without MinIO access
+    from src.minio import minio_client
+
+    images = {}
+    for record in records:
+        key = record["object_key"]
+        if key in images:
+            continue
+        response = minio_client.get_object(key)
+        try:
+            images[key] = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    return images
+
+
+async def replay(
+    records: List[Dict],
+    images: Dict[str, bytes],
+    target: str,
+    speed: float = 1.0,
+    max_in_flight: int = 256,
+    timeout: float = 300.0,
+) -> List[Dict]:
+    """Send every record to the target at its scheduled offset and collect the results."""
+    offsets = schedule_offsets(records, speed)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    url = target.rstrip("/") + "/diagnose"
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        start = time.perf_counter()
+
+        async def send(record: Dict, offset: float) -> Dict:
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                sent_at = time.perf_counter()
+                result = {
+                    "object_key": record["object_key"],
+                    "image_hash": record.get("image_hash"),
+                    "offset_s": round(offset, 3),
+                    "lag_ms": round((sent_at - start - offset) * 1000, 2),
+                    "original_duration_ms": record.get("duration_ms"),
+                }
+                filename = record["object_key"].split("_", 1)[-1]
+                files = {"file": (filename, images[record["object_key"]], record.get("content_type") or "image/jpeg")}
+                try:
+                    response = await client.post(url, files=files)
+                    result["status"] = response.status_code
+                except httpx.HTTPError as e:
+                    result["status"] = None
+                    result["error"] = type(e).__name__
+                result["latency_ms"] = round((time.perf_counter() - sent_at) * 1000, 2)
+                return result
+
+        return await asyncio.gather(*[send(record, offset) for record, offset in zip(records, offsets)])
+
+
+def write_results(path: str, results: List[Dict]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+
+def read_results(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_summary(summary: Dict):
+    print(f"requests: {summary['requests']}  error rate: {summary['error_rate']:.2%}")
+    for metric in ("mean", "p50", "p90", "p95", "p99", "max"):
+        print(f"  {metric:>4}: {summary[metric]:10.1f} ms")
+
+
+def print_comparison(comparison: Dict[str, Dict]):
+    print(f"{'metric':>10} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for metric, values in comparison.items():
+        if metric == "requests":
+            print(f"{metric:>10} {values['baseline']:>12} {values['candidate']:>12}")
+        elif metric == "error_rate":
+            print(f"{metric:>10} {values['baseline']:>12.2%} {values['candidate']:>12.2%}")
+        else:
+            print(f"{metric:>10} {values['baseline']:>10.1f}ms {values['candidate']:>10.1f}ms {values['change']:>+9.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured /diagnose traffic and compare builds.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Replay captured traffic against a target")
+    run_parser.add_argument("--capture", nargs="+", required=True, help="Captured JSONL files, including rotated ones")
+    run_parser.add_argument("--target", required=True, help="Base URL of the deployment, e.g. http://localhost:8000")
+    run_parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier (2 = twice as fast)")
+    run_parser.add_argument("--limit", type=int, default=None, help="Replay only the first N records")
+    run_parser.add_argument("--max-in-flight", type=int, default=256, help="Cap on concurrent requests")
+    run_parser.add_argument("--output", required=True, help="Where to write per-request results (JSONL)")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two replay result files")
+    compare_parser.add_argument("baseline", help="Results from the baseline build")
+    compare_parser.add_argument("candidate", help="Results from the candidate build")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        records = load_captured_records(args.capture, args.limit)
+        print(f"Loaded {len(records)} captured requests; fetching images...")
+        images = fetch_images(records)
+        results = asyncio.run(replay(records, images, args.target, args.speed, args.max_in_flight))
+        write_results(args.output, results)
+        print_summary(summarize(results))
+    else:
+        print_comparison(compare(read_results(args.baseline), read_results(args.candidate)))
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, UploadFile, File
-from .schemas import DiagnosisResponse
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Query
+from .schemas import DiagnosisResponse, DiagnosisHistoryItem
 from . import service
 
 router = APIRouter()
@@ -10,3 +12,15 @@ async def diagnose(file: UploadFile = File(...)):
     Diagnose a plant from an uploaded image.
     """
     return await service.diagnose_plant(file)
+
+@router.get("/diagnose/history", response_model=List[DiagnosisHistoryItem])
+async def diagnosis_history(
+    plant_name: Optional[str] = None,
+    condition: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[datetime] = None,
+):
+    """
+    List past diagnoses, newest first.
+    """
+    return await service.get_diagnosis_history(plant_name=plant_name, condition=condition, limit=limit, before=before)
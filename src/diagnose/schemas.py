@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 
 class DiagnosisRequest(BaseModel):
     pass
@@ -13,3 +14,18 @@ class DiagnosisResponse(BaseModel):
     condition: str
     detail_diagnosis: str
     action_plan: List[ActionPlanItem]
+
+class DiagnosisHistoryItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    image_hash: str
+    object_key: Optional[str] = None
+    plant_name: Optional[str] = None
+    condition: Optional[str] = None
+    result: Dict[str, Any]
+    stage_timings: Optional[Dict[str, float]] = None
+    stage_tokens: Optional[Dict[str, Dict[str, int]]] = None
+    total_duration_ms: Optional[float] = None
+    total_tokens: Optional[int] = None
+    created_at: datetime
@@ -2,15 +2,74 @@ import os
 import json
 import uuid
 import io
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from fastapi import UploadFile
 from src.config import settings
+from src.database import SessionLocal
 from src.minio import minio_client
-from .schemas import DiagnosisResponse
+from src.singleflight import async_single_flight
+from .schemas import DiagnosisResponse, DiagnosisHistoryItem
+from .metrics import StageMetrics
+from .history import diagnosis_history_writer, get_latest_by_image_hash, list_history
+from .capture import request_capture
 from src.diagnose.agent.workflows import diagnosis_workflow
 
+def _run_workflow(file_content: bytes) -> Tuple[str, StageMetrics]:
+    metrics = StageMetrics()
+    try:
+        raw_output = diagnosis_workflow(file_content, metrics)
+    finally:
+        metrics.finish()
+    return raw_output, metrics
+
+async def _find_reusable_result(image_hash: str) -> Optional[dict]:
+    if settings.DIAGNOSIS_RESULT_REUSE_SECONDS <= 0:
+        return None
+    try:
+        async with SessionLocal() as session:
+            previous = await get_latest_by_image_hash(session, image_hash, settings.DIAGNOSIS_RESULT_REUSE_SECONDS)
+        return previous.result if previous is not None else None
+    except Exception as e:
+        print(f"Error looking up previous diagnosis: {e}")
+        return None
+
 async def diagnose_plant(file: UploadFile) -> DiagnosisResponse:
+    trace: Dict = {}
+    if not settings.REQUEST_CAPTURE_ENABLED:
+        return await _diagnose_plant(file, trace)
+
+    received_at = time.time()
+    start = time.perf_counter()
+    outcome = "error"
+    error = None
+    try:
+        response = await _diagnose_plant(file, trace)
+        outcome = "ok"
+        return response
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        request_capture.record({
+            "timestamp": datetime.fromtimestamp(received_at, timezone.utc).isoformat(),
+            "received_at": received_at,
+            "content_type": file.content_type,
+            **trace,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "outcome": outcome,
+            "error": error,
+        })
+
+async def _diagnose_plant(file: UploadFile, trace: Dict) -> DiagnosisResponse:
+    # `trace` collects sanitized request details for request capture
     # 1. Read file content
     file_content = await file.read()
+    image_hash = hashlib.sha256(file_content).hexdigest()
+    trace.update(image_hash=image_hash, size_bytes=len(file_content))
 
     # 2. Upload file to Minio (optional, but good for storage)
     object_name = f"{uuid.uuid4()}_{file.filename}"
@@ -21,16 +80,46 @@ async def diagnose_plant(file: UploadFile) -> DiagnosisResponse:
         length=len(file_content),
         content_type=file.content_type
     )
+    trace["object_key"] = object_name
 
-    # 3. Run the diagnosis workflow
-    raw_output = diagnosis_workflow(file_content)
-    parsed_output = json.loads(raw_output)
+    # 3. Reuse a stored result for an identical image, if enabled
+    parsed_output = await _find_reusable_result(image_hash)
+    metrics = None
+    ran_workflow = False
+
+    if parsed_output is None:
+        # 4. Run the diagnosis workflow off the event loop; identical uploads that
+        # arrive while a run is in flight share its result
+        def start_workflow():
+            nonlocal ran_workflow
+            ran_workflow = True
+            return asyncio.to_thread(_run_workflow, file_content)
+
+        raw_output, metrics = await async_single_flight.do(("diagnosis", image_hash), start_workflow)
+        trace["stage_timings"] = metrics.timings
+        parsed_output = json.loads(raw_output)
+    trace["source"] = "workflow" if ran_workflow else ("coalesced" if metrics else "reused")
 
     plant_name = parsed_output.get("plant_name", "Unknown Plant")
     condition = parsed_output.get("condition", "Unknown Condition")
     detail_diagnosis = parsed_output.get("detail_diagnosis", "No detailed diagnosis found.")
     action_plan_list = parsed_output.get("action_plan", [])
 
+    # 5. Persist to history off the request path
+    if settings.DIAGNOSIS_HISTORY_ENABLED:
+        diagnosis_history_writer.enqueue({
+            "image_hash": image_hash,
+            "object_key": object_name,
+            "plant_name": plant_name,
+            "condition": condition,
+            "result": parsed_output,
+            "stage_timings": metrics.timings if metrics else {},
+            # Coalesced requests share the leader's run; only the leader spent tokens
+            "stage_tokens": metrics.tokens if ran_workflow else {},
+            "total_duration_ms": metrics.total_duration_ms if metrics else 0.0,
+            "total_tokens": metrics.total_tokens if ran_workflow else 0,
+        })
+
     return DiagnosisResponse(
         plant_name=plant_name,
         condition=condition,
@@ -38,3 +127,12 @@ async def diagnose_plant(file: UploadFile) -> DiagnosisResponse:
         action_plan=action_plan_list
     )
 
+async def get_diagnosis_history(
+    plant_name: Optional[str] = None,
+    condition: Optional[str] = None,
+    limit: int = 50,
+    before: Optional[datetime] = None,
+) -> List[DiagnosisHistoryItem]:
+    async with SessionLocal() as session:
+        rows = await list_history(session, plant_name=plant_name, condition=condition, limit=limit, before=before)
+    return [DiagnosisHistoryItem.model_validate(row) for row in rows]
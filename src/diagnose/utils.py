@@ -1,22 +1,85 @@
 import base64
 from openai import OpenAI
 from src.config import settings
+from src.singleflight import single_flight
+from src.diagnose.metrics import StageMetrics
+from src.diagnose.agent.stages import get_stage_config
+from typing import Optional
 import json
 
 embedding_client = OpenAI(api_key=settings.OPENAI_EMBEDDING_API_KEY, base_url=settings.OPENAI_BASE_URL)
 
-def get_embedding(text: str) -> list[float]:
+def extract_plant_and_condition_from_folder(folder_name: str):
+    """
+    Extract plant name and condition from folder name format: {plant}_{condition/disease_name}
+    Example: 'apple_rust_leaf' -> ('apple', 'rust leaf')
+    """
+    parts = folder_name.split('_')
+    if len(parts) < 2:
+        return "Unknown Plant", "Unknown Condition"
+    
+    plant_name = parts[0].replace('_', ' ').title()
+    condition_parts = parts[1:]
+    
+    # Remove 'leaf' if it's at the end as it's redundant for plant diseases
+    if condition_parts[-1].lower() == 'leaf':
+        condition_parts = condition_parts[:-1]
+    
+    condition = ' '.join(condition_parts).replace('_', ' ').title()
+    
+    # Handle special cases for healthy plants
+    if 'healthy' in condition.lower():
+        condition = 'Healthy'
+    
+    return plant_name, condition
+
+def _embedding_options(model: str, dimensions: int) -> dict:
+    options = {"model": model}
+    # Only the text-embedding-3 family supports shortened embeddings
+    if model.startswith("text-embedding-3"):
+        options["dimensions"] = dimensions
+    return options
+
+def _create_embedding(text: str, model: str, dimensions: int) -> list[float]:
     response = embedding_client.embeddings.create(
-        model="text-embedding-3-small",
         input=text,
+        **_embedding_options(model, dimensions),
     )
     return response.data[0].embedding
 
-def get_image_description(image_bytes: bytes) -> str:
+def get_embedding(text: str, model: Optional[str] = None, dimensions: Optional[int] = None) -> list[float]:
+    model = model or settings.OPENAI_EMBEDDING_MODEL
+    dimensions = dimensions or settings.OPENAI_EMBEDDING_DIMENSIONS
+    # Concurrent requests for the same text share one embeddings call
+    return single_flight.do(("embedding", model, dimensions, text), _create_embedding, text, model, dimensions)
+
+def get_embeddings(texts: list[str], model: Optional[str] = None, dimensions: Optional[int] = None) -> list[list[float]]:
+    """
+    Embed a batch of texts in a single API call, preserving input order.
+    """
+    if not texts:
+        return []
+    model = model or settings.OPENAI_EMBEDDING_MODEL
+    dimensions = dimensions or settings.OPENAI_EMBEDDING_DIMENSIONS
+    response = embedding_client.embeddings.create(
+        input=texts,
+        **_embedding_options(model, dimensions),
+    )
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+def _completion_options(stage: str) -> dict:
+    config = get_stage_config(stage)
+    options = {"model": config.model}
+    if config.max_tokens is not None:
+        options["max_tokens"] = config.max_tokens
+    if config.temperature is not None:
+        options["temperature"] = config.temperature
+    return options
+
+def get_image_description(image_bytes: bytes, metrics: Optional[StageMetrics] = None) -> str:
     base64_image = base64.b64encode(image_bytes).decode("utf-8")
     client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
     response = client.chat.completions.create(
-        model="GPT-4o-mini",
         messages=[
             {
                 "role": "system",
@@ -30,14 +93,16 @@ def get_image_description(image_bytes: bytes) -> str:
                 ],
             }
         ],
-        max_tokens=100,
+        **_completion_options("image_description"),
     )
+    if metrics is not None:
+        metrics.record_openai_usage("image_description", response)
     return response.choices[0].message.content.strip()
 
-def get_initial_plant_info(image_description: str) -> str:
+def get_initial_plant_info(image_description: str, metrics: Optional[StageMetrics] = None) -> str:
     client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+    prompt = f"Identify the plant name and its condition from this description: {image_description}"
     response = client.chat.completions.create(
-        model="GPT-4o-mini",
         messages=[
             {
                 "role": "system",
@@ -46,10 +111,13 @@ def get_initial_plant_info(image_description: str) -> str:
             {
                 "role": "user",
                 "content": [
-                    {"type": "text", "text": f"Identify the plant name and its condition from this description: {image_description}"},
+                    {"type": "text", "text": prompt},
                 ],
             }
         ],
-        max_tokens=100,
+        **_completion_options("initial_plant_info"),
     )
+    if metrics is not None:
+        metrics.record_prompt("initial_plant_info", prompt)
+        metrics.record_openai_usage("initial_plant_info", response)
     return response.choices[0].message.content.strip()
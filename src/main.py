@@ -1,10 +1,36 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from src.config import settings
+from src.database import engine
 from src.diagnose.router import router as diagnose_router
-# from src.assistant.router import router as assistant_router
-# from src.planner.router import router as planner_router
+from src.diagnose.agent.workflows import warm_condition_knowledge
+from src.diagnose.history import diagnosis_history_writer
+from src.diagnose.capture import request_capture
+from src.assistant.router import router as assistant_router
+from src.assistant.engine import care_schedule_engine
+from src.planner.router import router as planner_router
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_task = None
+    if settings.KNOWLEDGE_CACHE_WARM_ON_STARTUP:
+        # Warm in the background so startup is not blocked on LLM calls
+        warm_task = asyncio.create_task(asyncio.to_thread(warm_condition_knowledge))
+    if settings.DIAGNOSIS_HISTORY_ENABLED:
+        diagnosis_history_writer.start()
+    if settings.WEATHER_REFRESH_INTERVAL_SECONDS > 0:
+        care_schedule_engine.start(settings.WEATHER_REFRESH_INTERVAL_SECONDS)
+    yield
+    if warm_task is not None and not warm_task.done():
+        warm_task.cancel()
+    await care_schedule_engine.stop()
+    await diagnosis_history_writer.stop()
+    request_capture.stop()
+    await engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:9002",  # Your frontend application
@@ -19,8 +45,8 @@ app.add_middleware(
 )
 
 app.include_router(diagnose_router, tags=["diagnose"])
-# app.include_router(assistant_router, prefix="/assistant", tags=["assistant"])
-# app.include_router(planner_router, prefix="/planner", tags=["planner"])
+app.include_router(assistant_router, prefix="/assistant", tags=["assistant"])
+app.include_router(planner_router, prefix="/planner", tags=["planner"])
 
 @app.get("/")
 def read_root():
@@ -1,92 +1,334 @@
 from pinecone import Pinecone, ServerlessSpec
 from src.config import settings
 from src.diagnose.utils import get_embedding
-from typing import Dict, List, Optional
+from src.singleflight import single_flight
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import json
+import os
+import threading
 import uuid
 import time
 
+@dataclass(frozen=True)
+class ActiveIndex:
+    """The index that reads and writes go to, with the embedding settings it was built with."""
+    name: str
+    embedding_model: str
+    dimension: int
+    handle: Any = None
+
+def read_active_index_file(path: str) -> Optional[Dict]:
+    """Read the active index pointer written by the reindex tool, if any."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error reading active index file {path}: {e}")
+        return None
+
+def write_active_index_file(path: str, name: str, embedding_model: str, dimension: int, shadow: Optional[ActiveIndex] = None):
+    """
+    Atomically replace the active index pointer. `shadow` names an index being
+    rebuilt; every process mirrors its writes there until reads switch over.
+    """
+    pointer = {"index_name": name, "embedding_model": embedding_model, "dimension": dimension}
+    if shadow is not None:
+        pointer["shadow"] = {"index_name": shadow.name, "embedding_model": shadow.embedding_model, "dimension": shadow.dimension}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(pointer, f)
+    os.replace(tmp_path, path)
+
+def read_version_file(path: str) -> str:
+    """Read the shared index content marker; empty if no process has written it yet."""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+    except OSError as e:
+        print(f"Error reading index version file {path}: {e}")
+        return ""
+
+def write_version_file(path: str):
+    """Atomically replace the index content marker with a new random token."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(uuid.uuid4().hex)
+    os.replace(tmp_path, path)
+
+class IndexDimensionMismatchError(RuntimeError):
+    """The existing index was built at a different dimension than the one configured."""
+
 class PineconeService:
     def __init__(self):
         self.client = None
-        self.index = None
-        self.index_name = settings.PINECONE_INDEX_NAME
+        self._active = ActiveIndex(
+            name=settings.PINECONE_INDEX_NAME,
+            embedding_model=settings.OPENAI_EMBEDDING_MODEL,
+            dimension=settings.OPENAI_EMBEDDING_DIMENSIONS,
+        )
+        self._active_file_mtime: Optional[float] = None
+        # Index being rebuilt by the reindex tool; writes are mirrored to it
+        self._shadow: Optional[ActiveIndex] = None
+        self._switch_lock = threading.Lock()
         self._initialized = False
+        self._index_revision = 0
+        self._content_marker = ""
+        self._version_file_mtime: Optional[int] = None
+        self._vector_count: Optional[int] = None
+        self._stats_checked_at = 0.0
+
+    @property
+    def index(self):
+        return self._active.handle
+
+    @property
+    def index_name(self) -> str:
+        return self._active.name
+
+    @property
+    def embedding_model(self) -> str:
+        return self._active.embedding_model
+
+    @property
+    def dimension(self) -> int:
+        return self._active.dimension
+
+    @property
+    def index_version(self) -> str:
+        """
+        Identifier of the current index contents, shared by every process.
+        Changes when any process adds or deletes documents through this service
+        (via the version file), when the index's vector count changes (checked
+        every PINECONE_STATS_CHECK_SECONDS), or when reads switch to another
+        index, so caches built from query results can detect that they are stale.
+        """
+        self._refresh_content_version()
+        return f"{self.index_name}:{self._vector_count}:{self._content_marker}:{self._index_revision}"
+
+    def _refresh_content_version(self):
+        path = settings.PINECONE_VERSION_FILE
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._version_file_mtime:
+            self._version_file_mtime = mtime
+            self._content_marker = read_version_file(path) if mtime is not None else ""
+
+        interval = settings.PINECONE_STATS_CHECK_SECONDS
+        if not self._initialized or interval <= 0 or time.monotonic() - self._stats_checked_at < interval:
+            return
+        self._stats_checked_at = time.monotonic()
+        try:
+            self._vector_count = self._active.handle.describe_index_stats().total_vector_count
+        except Exception as e:
+            print(f"Error reading Pinecone index stats: {e}")
+
+    def _mark_content_changed(self):
+        """Tell every process using this index that its contents changed."""
+        self._index_revision += 1
+        try:
+            write_version_file(settings.PINECONE_VERSION_FILE)
+        except OSError as e:
+            print(f"Error writing index version file: {e}")
 
     def _initialize_index(self):
         """Initialize or create the Pinecone index if it doesn't exist."""
         if self._initialized:
             return
-            
+
         try:
             # Skip initialization if using placeholder API key
             if settings.PINECONE_API_KEY in ["your-pinecone-api-key", "your_pinecone_api_key_here"]:
                 print("Warning: Using placeholder Pinecone API key. Skipping initialization.")
                 return
-                
+
             self.client = Pinecone(api_key=settings.PINECONE_API_KEY)
-            
-            # Check if index exists
-            existing_indexes = self.client.list_indexes()
-            index_names = [index.name for index in existing_indexes]
-            
-            if self.index_name not in index_names:
-                # Create index with dimensions for text-embedding-3-small (1536 dimensions)
-                self.client.create_index(
-                    name=self.index_name,
-                    dimension=1536,  # text-embedding-3-small dimensions
-                    metric='cosine',
-                    spec=ServerlessSpec(
-                        cloud='aws',
-                        region=settings.PINECONE_ENVIRONMENT
-                    )
-                )
-                # Wait for index to be ready
-                time.sleep(5)
-            
-            self.index = self.client.Index(self.index_name)
+            self._refresh_active_index()
+
+            active = self._active
+            self.create_index_if_missing(active.name, active.dimension)
+            self._active = ActiveIndex(active.name, active.embedding_model, active.dimension, self.client.Index(active.name))
             self._initialized = True
-            
+            # Read the vector count now, so the first stats check doesn't look like a content change
+            self._refresh_content_version()
+
+        except IndexDimensionMismatchError:
+            # Queries against this index would all fail; don't degrade to empty context
+            raise
         except Exception as e:
             print(f"Error initializing Pinecone index: {e}")
             print("Pinecone service will not be available until a valid API key is configured.")
 
+    def create_index_if_missing(self, name: str, dimension: int) -> bool:
+        """
+        Create a serverless index with the given dimension if it doesn't exist.
+
+        Returns:
+            bool: True if the index was created
+
+        Raises:
+            IndexDimensionMismatchError: If the index exists with a different dimension
+        """
+        existing_indexes = self.client.list_indexes()
+        index_names = [index.name for index in existing_indexes]
+        if name in index_names:
+            existing_dimension = self.client.describe_index(name).dimension
+            if existing_dimension != dimension:
+                raise IndexDimensionMismatchError(
+                    f"Pinecone index '{name}' has dimension {existing_dimension}, but {dimension} is configured. "
+                    f"Set OPENAI_EMBEDDING_DIMENSIONS={existing_dimension}, or keep it and build a new index with "
+                    f"`python -m src.reindex --dimensions {dimension}` before changing it."
+                )
+            return False
+
+        self.client.create_index(
+            name=name,
+            dimension=dimension,
+            metric='cosine',
+            spec=ServerlessSpec(
+                cloud='aws',
+                region=settings.PINECONE_ENVIRONMENT
+            )
+        )
+        # Wait for index to be ready
+        time.sleep(5)
+        return True
+
+    def _refresh_active_index(self):
+        """
+        Pick up an index switch written by the reindex tool from another process.
+        Only re-reads the pointer file when its modification time changes.
+        """
+        path = settings.PINECONE_ACTIVE_INDEX_FILE
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return
+        if mtime == self._active_file_mtime:
+            return
+
+        pointer = read_active_index_file(path)
+        self._active_file_mtime = mtime
+        if not pointer:
+            return
+        self._set_shadow(pointer.get("shadow"))
+        active = self._active
+        if (pointer.get("index_name"), pointer.get("dimension")) == (active.name, active.dimension):
+            return
+        self._switch_active(pointer["index_name"], pointer["embedding_model"], int(pointer["dimension"]))
+
+    def _switch_active(self, name: str, embedding_model: str, dimension: int):
+        with self._switch_lock:
+            handle = self.client.Index(name) if self.client is not None else None
+            # A single reference assignment, so readers see either the old or the new index
+            self._active = ActiveIndex(name, embedding_model, dimension, handle)
+            self._index_revision += 1
+            # Pick up the new index's vector count on the next version check
+            self._stats_checked_at = 0.0
+
+    def _set_shadow(self, spec: Optional[Dict]):
+        if not spec:
+            self._shadow = None
+        elif self._shadow is None or self._shadow.name != spec["index_name"]:
+            handle = self.client.Index(spec["index_name"]) if self.client is not None else None
+            self._shadow = ActiveIndex(spec["index_name"], spec["embedding_model"], int(spec["dimension"]), handle)
+
+    def start_shadow_writes(self, target: ActiveIndex):
+        """
+        Mirror every add and delete, in this and every other process, into the
+        target index as well as the active one, until `switch_index` or
+        `stop_shadow_writes` is called.
+        """
+        self._ensure_initialized()
+        active = self._active
+        self._shadow = target
+        path = settings.PINECONE_ACTIVE_INDEX_FILE
+        write_active_index_file(path, active.name, active.embedding_model, active.dimension, shadow=target)
+        self._active_file_mtime = os.path.getmtime(path)
+
+    def stop_shadow_writes(self):
+        """Stop mirroring writes into the index being rebuilt."""
+        active = self._active
+        self._shadow = None
+        path = settings.PINECONE_ACTIVE_INDEX_FILE
+        write_active_index_file(path, active.name, active.embedding_model, active.dimension)
+        self._active_file_mtime = os.path.getmtime(path)
+
+    def switch_index(self, name: str, embedding_model: str, dimension: int):
+        """
+        Switch reads and writes to another index, in this process and, through
+        the active index file, in every other process using this service.
+
+        Args:
+            name (str): Name of the index to switch to
+            embedding_model (str): Embedding model the index was built with
+            dimension (int): Embedding dimension of the index
+        """
+        self._ensure_initialized()
+        self._switch_active(name, embedding_model, dimension)
+        self._shadow = None
+        path = settings.PINECONE_ACTIVE_INDEX_FILE
+        write_active_index_file(path, name, embedding_model, dimension)
+        self._active_file_mtime = os.path.getmtime(path)
+
     def _ensure_initialized(self):
         """Ensure the service is initialized before use."""
         if not self._initialized:
             self._initialize_index()
-            
+
         if not self._initialized:
             raise RuntimeError("Pinecone service is not initialized. Please check your API key configuration.")
 
+        self._refresh_active_index()
+
+    def embed_query(self, text: str, active: Optional[ActiveIndex] = None) -> List[float]:
+        """Embed text with the model and dimension of the given (default: active) index."""
+        active = active or self._active
+        return get_embedding(text, model=active.embedding_model, dimensions=active.dimension)
+
     def query_disease_info(self, query: str, n_results: int = 1) -> Dict:
         """
         Query disease information from Pinecone.
-        
+        Concurrent identical queries are coalesced into a single Pinecone call.
+
         Args:
             query (str): The search query
             n_results (int): Number of results to return
-            
+
         Returns:
             Dict: Query results in ChromaDB-compatible format
         """
+        return single_flight.do(
+            ("vector_query", self.index_version, query, n_results),
+            self._query_disease_info, query, n_results
+        )
+
+    def _query_disease_info(self, query: str, n_results: int) -> Dict:
         try:
             self._ensure_initialized()
-            query_embedding = get_embedding(query)
-            
+            active = self._active
+            query_embedding = self.embed_query(query, active)
+
             # Query Pinecone
-            response = self.index.query(
+            response = active.handle.query(
                 vector=query_embedding,
                 top_k=n_results,
                 include_metadata=True,
                 include_values=False
             )
-            
+
             # Convert to ChromaDB-compatible format
             documents = []
             metadatas = []
             ids = []
             distances = []
-            
+
             for match in response.matches:
                 documents.append(match.metadata.get('document', ''))
                 metadatas.append({
@@ -95,13 +337,15 @@ class PineconeService:
                 })
                 ids.append(match.id)
                 distances.append(1 - match.score)  # Convert similarity to distance
-            
+
             return {
                 'documents': [documents] if documents else [[]],
                 'metadatas': [metadatas] if metadatas else [[]],
                 'ids': [ids] if ids else [[]],
                 'distances': [distances] if distances else [[]]
             }
+        except IndexDimensionMismatchError:
+            raise
         except Exception as e:
             print(f"Error querying Pinecone: {e}")
             return {
@@ -114,32 +358,46 @@ class PineconeService:
     def add_disease_info(self, disease_info: Dict):
         """
         Add disease information to Pinecone.
-        
+
         Args:
             disease_info (Dict): Dictionary with 'document', 'metadata', and 'id' keys
         """
         try:
             self._ensure_initialized()
-            
+            active = self._active
+
             # Generate embedding for the document
-            document_embedding = get_embedding(disease_info["document"])
-            
+            document_embedding = self.embed_query(disease_info["document"], active)
+
             # Prepare metadata for Pinecone (flatten the structure)
             pinecone_metadata = {
                 'document': disease_info["document"],
                 'plant_name': disease_info["metadata"].get('plant_name', ''),
                 'condition': disease_info["metadata"].get('condition', '')
             }
-            
+
             # Upsert to Pinecone
-            self.index.upsert([
+            active.handle.upsert([
                 {
                     'id': disease_info["id"],
                     'values': document_embedding,
                     'metadata': pinecone_metadata
                 }
             ])
-            
+            self._mark_content_changed()
+
+            shadow = self._shadow
+            if shadow is not None and shadow.name != active.name:
+                try:
+                    shadow.handle.upsert([{
+                        'id': disease_info["id"],
+                        'values': self.embed_query(disease_info["document"], shadow),
+                        'metadata': pinecone_metadata
+                    }])
+                except Exception as e:
+                    # The reindex tool re-diffs document IDs before switching
+                    print(f"Error mirroring to index '{shadow.name}': {e}")
+
         except Exception as e:
             print(f"Error adding to Pinecone: {e}")
             raise
@@ -147,39 +405,33 @@ class PineconeService:
     def delete_disease_info(self, doc_id: str):
         """
         Delete a document from Pinecone.
-        
+
         Args:
             doc_id (str): The ID of the document to delete
         """
         try:
             self._ensure_initialized()
             self.index.delete(ids=[doc_id])
+            self._mark_content_changed()
+            shadow = self._shadow
+            if shadow is not None and shadow.name != self.index_name:
+                try:
+                    shadow.handle.delete(ids=[doc_id])
+                except Exception as e:
+                    print(f"Error mirroring delete to index '{shadow.name}': {e}")
         except Exception as e:
             print(f"Error deleting from Pinecone: {e}")
             raise
 
-    def list_all_ids(self) -> List[str]:
+    def list_all_ids(self, active: Optional[ActiveIndex] = None) -> List[str]:
         """
-        List all document IDs in the index.
-        Note: This is a simplified implementation for small datasets.
-        For large datasets, consider implementing pagination.
+        List every document ID in the given (default: active) index, page by page.
+        Errors propagate: callers such as the reindex tool must not mistake a
+        failed listing for an empty index.
         """
-        try:
-            self._ensure_initialized()
-            
-            # This is a workaround since Pinecone doesn't have a direct list_ids method
-            # We'll query with a dummy vector to get all results
-            dummy_vector = [0.0] * 1536
-            response = self.index.query(
-                vector=dummy_vector,
-                top_k=10000,  # Adjust based on your dataset size
-                include_metadata=False,
-                include_values=False
-            )
-            return [match.id for match in response.matches]
-        except Exception as e:
-            print(f"Error listing IDs: {e}")
-            return []
+        self._ensure_initialized()
+        active = active or self._active
+        return [vector.id for page in active.handle.list() for vector in page.vectors]
 
 # Initialize the Pinecone service instance
 pinecone_service = PineconeService()
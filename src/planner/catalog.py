@@ -0,0 +1,150 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+LIGHT_LEVELS = ["Low", "Medium", "High"]
+HUMIDITY_LEVELS = ["Low", "Medium", "High"]
+EXPERIENCE_LEVELS = ["Beginner", "Intermediate", "Experienced"]
+STYLES = ["minimalist", "modern", "tropical", "bohemian", "classic", "rustic", "desert"]
+
+# How well each care difficulty (1 = easy, 2 = moderate, 3 = demanding) suits each experience level
+EXPERIENCE_FIT_BY_DIFFICULTY = np.array([
+    # Beginner, Intermediate, Experienced
+    [1.0, 1.0, 0.8],
+    [0.4, 1.0, 1.0],
+    [0.0, 0.5, 1.0],
+])
+
+# Relative weight of each questionnaire answer in the final score
+WEIGHTS = {"light": 0.4, "humidity": 0.25, "experience": 0.2, "style": 0.15}
+
+# light / humidity: suitability for Low, Medium, High (0 = will not thrive)
+PLANT_PROFILES: List[Dict] = [
+    {"name": "Snake Plant", "light": (1.0, 1.0, 0.8), "humidity": (1.0, 1.0, 0.6), "difficulty": 1,
+     "styles": ("minimalist", "modern", "desert"),
+     "description": "A low-maintenance plant that thrives in a variety of light conditions."},
+    {"name": "ZZ Plant", "light": (1.0, 1.0, 0.5), "humidity": (1.0, 1.0, 0.7), "difficulty": 1,
+     "styles": ("minimalist", "modern"),
+     "description": "An extremely drought-tolerant plant perfect for beginners."},
+    {"name": "Pothos", "light": (0.9, 1.0, 0.6), "humidity": (0.7, 1.0, 1.0), "difficulty": 1,
+     "styles": ("bohemian", "tropical", "classic"),
+     "description": "A versatile and easy-to-care-for trailing plant."},
+    {"name": "Spider Plant", "light": (0.5, 1.0, 0.8), "humidity": (0.7, 1.0, 1.0), "difficulty": 1,
+     "styles": ("bohemian", "classic", "rustic"),
+     "description": "A forgiving, fast-growing plant that produces cascading baby plantlets."},
+    {"name": "Cast Iron Plant", "light": (1.0, 0.9, 0.2), "humidity": (0.9, 1.0, 0.8), "difficulty": 1,
+     "styles": ("classic", "minimalist"),
+     "description": "Nearly indestructible foliage that tolerates deep shade and neglect."},
+    {"name": "Peace Lily", "light": (0.9, 1.0, 0.3), "humidity": (0.3, 0.9, 1.0), "difficulty": 1,
+     "styles": ("classic", "modern"),
+     "description": "Glossy leaves and white blooms that tell you when it needs water."},
+    {"name": "Chinese Evergreen", "light": (1.0, 1.0, 0.4), "humidity": (0.6, 1.0, 1.0), "difficulty": 1,
+     "styles": ("modern", "minimalist", "tropical"),
+     "description": "Patterned foliage that stays colorful in low light."},
+    {"name": "Heartleaf Philodendron", "light": (0.8, 1.0, 0.6), "humidity": (0.6, 1.0, 1.0), "difficulty": 1,
+     "styles": ("bohemian", "tropical"),
+     "description": "A heart-shaped trailing vine that adapts to most rooms."},
+    {"name": "Rubber Plant", "light": (0.4, 1.0, 0.9), "humidity": (0.7, 1.0, 0.9), "difficulty": 2,
+     "styles": ("modern", "minimalist", "classic"),
+     "description": "Bold, glossy leaves that grow into a striking indoor tree."},
+    {"name": "Monstera Deliciosa", "light": (0.3, 1.0, 0.8), "humidity": (0.4, 0.9, 1.0), "difficulty": 2,
+     "styles": ("tropical", "bohemian", "modern"),
+     "description": "Iconic split leaves that bring a lush, tropical feel to bright rooms."},
+    {"name": "Fiddle Leaf Fig", "light": (0.0, 0.6, 1.0), "humidity": (0.4, 1.0, 0.9), "difficulty": 3,
+     "styles": ("modern", "minimalist"),
+     "description": "A statement tree with large violin-shaped leaves that rewards consistent care."},
+    {"name": "Bird of Paradise", "light": (0.0, 0.5, 1.0), "humidity": (0.5, 1.0, 1.0), "difficulty": 2,
+     "styles": ("tropical", "modern"),
+     "description": "Large paddle-shaped leaves that love full sun."},
+    {"name": "Aloe Vera", "light": (0.0, 0.6, 1.0), "humidity": (1.0, 0.7, 0.2), "difficulty": 1,
+     "styles": ("desert", "minimalist", "rustic"),
+     "description": "A sun-loving succulent with soothing gel and very low water needs."},
+    {"name": "Jade Plant", "light": (0.0, 0.6, 1.0), "humidity": (1.0, 0.8, 0.3), "difficulty": 1,
+     "styles": ("desert", "classic", "minimalist"),
+     "description": "A long-lived succulent with coin-shaped leaves that thrives on sun and neglect."},
+    {"name": "Echeveria", "light": (0.0, 0.4, 1.0), "humidity": (1.0, 0.6, 0.1), "difficulty": 2,
+     "styles": ("desert", "modern", "minimalist"),
+     "description": "Compact rosette succulents for sunny windowsills."},
+    {"name": "Ponytail Palm", "light": (0.0, 0.7, 1.0), "humidity": (1.0, 0.9, 0.4), "difficulty": 1,
+     "styles": ("desert", "modern", "bohemian"),
+     "description": "A quirky, drought-tolerant plant that stores water in its swollen trunk."},
+    {"name": "Boston Fern", "light": (0.4, 1.0, 0.3), "humidity": (0.0, 0.6, 1.0), "difficulty": 2,
+     "styles": ("classic", "bohemian", "rustic"),
+     "description": "Feathery fronds that flourish in humid rooms like bathrooms."},
+    {"name": "Calathea", "light": (0.6, 1.0, 0.2), "humidity": (0.0, 0.6, 1.0), "difficulty": 3,
+     "styles": ("tropical", "bohemian", "modern"),
+     "description": "Strikingly patterned leaves that fold up at night; loves humidity."},
+    {"name": "Maidenhair Fern", "light": (0.5, 1.0, 0.2), "humidity": (0.0, 0.4, 1.0), "difficulty": 3,
+     "styles": ("classic", "rustic"),
+     "description": "Delicate lacy fronds for experienced growers with humid spaces."},
+    {"name": "String of Pearls", "light": (0.0, 0.7, 1.0), "humidity": (1.0, 0.8, 0.3), "difficulty": 2,
+     "styles": ("bohemian", "desert", "modern"),
+     "description": "A trailing succulent with bead-like leaves for bright hanging spots."},
+    {"name": "Parlor Palm", "light": (0.9, 1.0, 0.4), "humidity": (0.6, 1.0, 1.0), "difficulty": 1,
+     "styles": ("classic", "tropical"),
+     "description": "A graceful, slow-growing palm that handles lower light."},
+    {"name": "Orchid (Phalaenopsis)", "light": (0.3, 1.0, 0.5), "humidity": (0.3, 0.9, 1.0), "difficulty": 2,
+     "styles": ("modern", "minimalist", "classic"),
+     "description": "Elegant, long-lasting blooms with surprisingly simple care."},
+    {"name": "English Ivy", "light": (0.6, 1.0, 0.6), "humidity": (0.4, 1.0, 1.0), "difficulty": 2,
+     "styles": ("classic", "rustic"),
+     "description": "A classic trailing vine that likes cool rooms and steady moisture."},
+    {"name": "Rosemary", "light": (0.0, 0.4, 1.0), "humidity": (0.9, 0.9, 0.4), "difficulty": 2,
+     "styles": ("rustic", "classic"),
+     "description": "A fragrant, edible herb for the sunniest window in the house."},
+]
+
+
+class PlantCatalog:
+    """
+    In-memory plant catalog stored as NumPy feature arrays, so every plant can be
+    scored against a questionnaire in one vectorized pass.
+    """
+
+    def __init__(self, profiles: List[Dict]):
+        self.names = [profile["name"] for profile in profiles]
+        self.descriptions = [profile["description"] for profile in profiles]
+        self.light_fit = np.array([profile["light"] for profile in profiles], dtype=np.float64)
+        self.humidity_fit = np.array([profile["humidity"] for profile in profiles], dtype=np.float64)
+        difficulty = np.array([profile["difficulty"] for profile in profiles], dtype=np.intp)
+        self.experience_fit = EXPERIENCE_FIT_BY_DIFFICULTY[difficulty - 1]
+        self.style_fit = np.array(
+            [[1.0 if style in profile["styles"] else 0.0 for style in STYLES] for profile in profiles],
+            dtype=np.float64,
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def score(self, light: str, humidity: str, experience: str, styles: Sequence[str] = ()) -> np.ndarray:
+        """
+        Score every plant for one questionnaire. A plant earns the style weight if it
+        matches any of the requested styles. Plants that cannot thrive in the given
+        light or humidity score -inf.
+        """
+        light_column = self.light_fit[:, LIGHT_LEVELS.index(light)]
+        humidity_column = self.humidity_fit[:, HUMIDITY_LEVELS.index(humidity)]
+        scores = (
+            WEIGHTS["light"] * light_column
+            + WEIGHTS["humidity"] * humidity_column
+            + WEIGHTS["experience"] * self.experience_fit[:, EXPERIENCE_LEVELS.index(experience)]
+        )
+        style_columns = [STYLES.index(style) for style in styles if style in STYLES]
+        if style_columns:
+            scores = scores + WEIGHTS["style"] * self.style_fit[:, style_columns].max(axis=1)
+        return np.where((light_column > 0) & (humidity_column > 0), scores, -np.inf)
+
+    def top_k(self, scores: np.ndarray, k: int = 3) -> List[int]:
+        """Indices of the k best-scoring viable plants, best first."""
+        k = min(k, len(scores))
+        # Partition only to find the k-th best score, then keep every plant tied
+        # with it, so ties at the cutoff are not decided by the partition order
+        kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth_score)
+        # Order by score, breaking ties by catalog position
+        ordered = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [int(i) for i in ordered if np.isfinite(scores[i])]
+
+
+# Initialize the plant catalog instance
+plant_catalog = PlantCatalog(PLANT_PROFILES)
@@ -0,0 +1,13 @@
+from typing import List
+from fastapi import APIRouter
+from .schemas import RecommendationRequest, PlantRecommendation
+from . import service
+
+router = APIRouter()
+
+@router.post("/recommendations", response_model=List[PlantRecommendation])
+async def recommendations(request: RecommendationRequest):
+    """
+    Recommend the top 3 plants for the user's environment, experience and style.
+    """
+    return await service.recommend_plants(request)
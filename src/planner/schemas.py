@@ -0,0 +1,31 @@
+from enum import Enum
+from pydantic import BaseModel
+
+class LightLevel(str, Enum):
+    LOW = "Low"
+    MEDIUM = "Medium"
+    HIGH = "High"
+
+class HumidityLevel(str, Enum):
+    LOW = "Low"
+    MEDIUM = "Medium"
+    HIGH = "High"
+
+class ExperienceLevel(str, Enum):
+    BEGINNER = "Beginner"
+    INTERMEDIATE = "Intermediate"
+    EXPERIENCED = "Experienced"
+
+class Environment(BaseModel):
+    light: LightLevel
+    humidity: HumidityLevel
+
+class RecommendationRequest(BaseModel):
+    environment: Environment
+    experience: ExperienceLevel
+    # Free text, e.g. "Minimalist"; styles outside the catalog are ignored when scoring
+    style: str = ""
+
+class PlantRecommendation(BaseModel):
+    plant_name: str
+    description: str
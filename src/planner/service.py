@@ -0,0 +1,74 @@
+import asyncio
+import json
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from openai import OpenAI
+from src.config import settings
+from .catalog import STYLES, plant_catalog
+from .schemas import RecommendationRequest, PlantRecommendation
+
+# (light, humidity, experience, known styles) - identical questionnaires share one result
+Signature = Tuple[str, str, str, Tuple[str, ...]]
+
+def questionnaire_signature(request: RecommendationRequest) -> Signature:
+    """
+    Normalize a questionnaire into a hashable cache key.
+    Example: style 'Modern Minimalist' -> styles ('minimalist', 'modern')
+    """
+    words = request.style.lower().replace(",", " ").split()
+    styles = tuple(sorted({word for word in words if word in STYLES}))
+    return (request.environment.light.value, request.environment.humidity.value, request.experience.value, styles)
+
+@lru_cache(maxsize=settings.PLANNER_CACHE_SIZE)
+def rank_plants(signature: Signature, k: int = 3) -> Tuple[Tuple[str, str], ...]:
+    """Top k (plant_name, description) pairs for a questionnaire signature."""
+    light, humidity, experience, styles = signature
+    scores = plant_catalog.score(light, humidity, experience, styles)
+    return tuple(
+        (plant_catalog.names[i], plant_catalog.descriptions[i])
+        for i in plant_catalog.top_k(scores, k)
+    )
+
+@lru_cache(maxsize=settings.PLANNER_CACHE_SIZE)
+def explain_recommendations(signature: Signature, plant_names: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Ask the LLM why each plant suits the questionnaire. Only successful
+    responses are cached; errors propagate to the caller.
+    """
+    light, humidity, experience, styles = signature
+    client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+    response = client.chat.completions.create(
+        model=settings.LLM_DEFAULT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a houseplant expert. For each plant, write one friendly sentence explaining why it suits the user's space. Respond with a JSON object mapping each plant name to its sentence."
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Light: {light}\nHumidity: {humidity}\nExperience: {experience}\n"
+                    f"Style: {', '.join(styles) or 'no preference'}\nPlants: {', '.join(plant_names)}"
+                ),
+            }
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=300,
+    )
+    explanations = json.loads(response.choices[0].message.content)
+    return {name: explanations[name] for name in plant_names if isinstance(explanations.get(name), str)}
+
+async def recommend_plants(request: RecommendationRequest) -> List[PlantRecommendation]:
+    signature = questionnaire_signature(request)
+    ranked = rank_plants(signature)
+    descriptions = {name: description for name, description in ranked}
+
+    if settings.PLANNER_LLM_EXPLANATIONS and ranked:
+        try:
+            explanations = await asyncio.to_thread(explain_recommendations, signature, tuple(descriptions))
+            descriptions.update(explanations)
+        except Exception as e:
+            # Catalog descriptions are always a valid answer
+            print(f"Error generating plant explanations: {e}")
+
+    return [PlantRecommendation(plant_name=name, description=description) for name, description in descriptions.items()]
@@ -0,0 +1,212 @@
+"""
+Rebuild the Pinecone index at a new embedding model or dimension, then switch reads over.
+
+The running API keeps serving from the current index while this runs. Every stored
+document is re-embedded in batches into a new index. Writes made meanwhile (e.g. by
+data/load.py) are mirrored into the new index through the active index pointer, and
+the document IDs are diffed again before switching. Reads switch only if the new
+index holds every document and recall against the current index, checked on a sample
+of queries, meets the threshold. Running services pick the new index up on their next query.
+
+Usage:
+    python -m src.reindex --dimensions 512
+    python -m src.reindex --dimensions 256 --index-name plant-diseases-256 --min-recall 0.8
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from src.config import settings
+from src.diagnose.utils import get_embeddings
+from src.pinecone import ActiveIndex, pinecone_service
+
+
+def batched(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def recall_at_k(reference_ids: List[str], candidate_ids: List[str]) -> float:
+    """
+    Fraction of the reference top-k IDs that also appear in the candidate top-k.
+    Example: recall_at_k(['a', 'b'], ['b', 'c']) -> 0.5
+    """
+    if not reference_ids:
+        return 1.0
+    return len(set(reference_ids) & set(candidate_ids)) / len(reference_ids)
+
+
+def copy_documents(source: ActiveIndex, target: ActiveIndex, doc_ids: List[str], batch_size: int) -> List[Dict]:
+    """
+    Re-embed every document from the source index into the target index.
+
+    Returns:
+        List[Dict]: Metadata of the copied documents, used to build recall queries
+    """
+    copied = []
+    for batch_ids in batched(doc_ids, batch_size):
+        response = source.handle.fetch(ids=batch_ids)
+        records = [(doc_id, dict(vector.metadata or {})) for doc_id, vector in response.vectors.items()]
+        records = [(doc_id, metadata) for doc_id, metadata in records if metadata.get("document")]
+        if not records:
+            continue
+
+        embeddings = get_embeddings(
+            [metadata["document"] for _, metadata in records],
+            model=target.embedding_model,
+            dimensions=target.dimension,
+        )
+        target.handle.upsert([
+            {"id": doc_id, "values": embedding, "metadata": metadata}
+            for (doc_id, metadata), embedding in zip(records, embeddings)
+        ])
+        copied.extend(metadata for _, metadata in records)
+        print(f"  Re-embedded {len(copied)}/{len(doc_ids)} documents")
+    return copied
+
+
+def wait_for_vector_count(target: ActiveIndex, expected: int, timeout: float = 120.0):
+    """Wait until the target index reports the expected number of vectors."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        count = target.handle.describe_index_stats().total_vector_count
+        if count >= expected:
+            return
+        time.sleep(2)
+    print(f"Warning: target index reports fewer than {expected} vectors after {timeout:.0f}s")
+
+
+def build_recall_queries(documents: List[Dict], sample_size: int) -> List[str]:
+    """
+    Build queries shaped like production traffic: condition names, as sent by the
+    disease querier, plus a sample of stored document texts.
+    """
+    conditions = sorted({doc.get("condition", "") for doc in documents} - {""})
+    sampled = random.sample(documents, min(sample_size, len(documents)))
+    return conditions + [doc["document"] for doc in sampled]
+
+
+def measure_recall(source: ActiveIndex, target: ActiveIndex, queries: List[str], top_k: int) -> Optional[float]:
+    """Average recall@k of the target index against the source index, or None if there are no queries."""
+    if not queries:
+        return None
+    source_vectors = get_embeddings(queries, model=source.embedding_model, dimensions=source.dimension)
+    target_vectors = get_embeddings(queries, model=target.embedding_model, dimensions=target.dimension)
+
+    recalls = []
+    for source_vector, target_vector in zip(source_vectors, target_vectors):
+        source_ids = [m.id for m in source.handle.query(vector=source_vector, top_k=top_k).matches]
+        target_ids = [m.id for m in target.handle.query(vector=target_vector, top_k=top_k).matches]
+        recalls.append(recall_at_k(source_ids, target_ids))
+    return sum(recalls) / len(recalls)
+
+
+def reindex(
+    dimensions: int,
+    embedding_model: Optional[str] = None,
+    index_name: Optional[str] = None,
+    batch_size: int = 100,
+    top_k: int = 5,
+    sample_size: int = 50,
+    min_recall: float = 0.9,
+    switch: bool = True,
+) -> Dict:
+    """
+    Build a new index at the given dimension and switch reads to it if it holds
+    every document and recall holds. Listing or copy errors propagate.
+
+    Returns:
+        Dict: Summary with the new index name, document count, recall and whether reads switched
+    """
+    pinecone_service._ensure_initialized()
+    source = ActiveIndex(
+        pinecone_service.index_name,
+        pinecone_service.embedding_model,
+        pinecone_service.dimension,
+        pinecone_service.index,
+    )
+    embedding_model = embedding_model or source.embedding_model
+    index_name = index_name or f"{settings.PINECONE_INDEX_NAME}-{dimensions}"
+    if index_name == source.name:
+        raise ValueError(f"Target index '{index_name}' is the active index; choose another name")
+
+    print(f"Reindexing '{source.name}' ({source.dimension}d) into '{index_name}' ({dimensions}d, {embedding_model})")
+    pinecone_service.create_index_if_missing(index_name, dimensions)
+    target = ActiveIndex(index_name, embedding_model, dimensions, pinecone_service.client.Index(index_name))
+
+    # Mirror writes made during the copy into the new index
+    pinecone_service.start_shadow_writes(target)
+    switched = False
+    try:
+        doc_ids = pinecone_service.list_all_ids(source)
+        documents = copy_documents(source, target, doc_ids, batch_size)
+
+        # Catch writers that had not yet picked up the shadow pointer
+        current_ids = pinecone_service.list_all_ids(source)
+        documents += copy_documents(source, target, sorted(set(current_ids) - set(doc_ids)), batch_size)
+        # Drop documents deleted meanwhile, and leftovers from an earlier run into the same index
+        stale = sorted(set(pinecone_service.list_all_ids(target)) - set(current_ids))
+        if stale:
+            target.handle.delete(ids=stale)
+        wait_for_vector_count(target, len(current_ids))
+
+        source_count = source.handle.describe_index_stats().total_vector_count
+        target_count = target.handle.describe_index_stats().total_vector_count
+        print(f"'{source.name}' holds {source_count} vectors; '{index_name}' holds {target_count}")
+
+        recall = measure_recall(source, target, build_recall_queries(documents, sample_size), top_k)
+        if recall is not None:
+            print(f"Recall@{top_k} against '{source.name}': {recall:.3f} (minimum {min_recall:.3f})")
+
+        if not documents:
+            print("No documents were copied; reads stay on the current index")
+        elif target_count < source_count:
+            print("The new index is missing documents; reads stay on the current index")
+        elif recall is None:
+            print("No recall queries could be built, so recall cannot be verified; reads stay on the current index")
+        elif recall < min_recall:
+            print("Recall below threshold; reads stay on the current index")
+        elif not switch:
+            print("Not switching reads (--no-switch)")
+        else:
+            pinecone_service.switch_index(index_name, embedding_model, dimensions)
+            switched = True
+            print(f"Switched reads to '{index_name}'. The old index '{source.name}' was left in place.")
+    finally:
+        if not switched:
+            pinecone_service.stop_shadow_writes()
+
+    return {
+        "index_name": index_name,
+        "documents": len(documents),
+        "source_vectors": source_count,
+        "target_vectors": target_count,
+        "recall": recall,
+        "switched": switched,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the Pinecone index at a new embedding dimension.")
+    parser.add_argument("--dimensions", type=int, required=True, help="Embedding dimension of the new index")
+    parser.add_argument("--model", default=None, help="Embedding model (default: the active index's model)")
+    parser.add_argument("--index-name", default=None, help="Name of the new index (default: <PINECONE_INDEX_NAME>-<dimensions>)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Documents re-embedded per API call")
+    parser.add_argument("--top-k", type=int, default=5, help="Depth used for the recall check")
+    parser.add_argument("--sample-size", type=int, default=50, help="Stored documents used as recall queries")
+    parser.add_argument("--min-recall", type=float, default=0.9, help="Minimum recall@k required to switch reads")
+    parser.add_argument("--no-switch", action="store_true", help="Build and check the new index without switching reads")
+    args = parser.parse_args()
+
+    reindex(
+        dimensions=args.dimensions,
+        embedding_model=args.model,
+        index_name=args.index_name,
+        batch_size=args.batch_size,
+        top_k=args.top_k,
+        sample_size=args.sample_size,
+        min_recall=args.min_recall,
+        switch=not args.no_switch,
+    )
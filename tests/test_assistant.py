@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the Personal Care Assistant schedule engine.
+
+Weather comes from the offline stub provider and schedules are stored in SQLite.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the project root to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.assistant.care import get_care_profile, schedule_for, weather_adjustment
+from src.assistant.engine import CareScheduleEngine
+from src.assistant.weather import StubWeatherProvider, WeatherConditions
+from src.database import Base
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+NOW = datetime(2026, 7, 1, tzinfo=timezone.utc)
+HEAT_WAVE = WeatherConditions(temperature_c=36.0, humidity=25.0)
+
+
+def test_weather_adjustment_is_bucketed():
+    """Small weather swings keep the signature; a heat wave waters sooner and fertilizes later."""
+    mild = weather_adjustment(WeatherConditions(temperature_c=20.0, humidity=50.0))
+    assert weather_adjustment(WeatherConditions(temperature_c=22.5, humidity=55.0)).signature == mild.signature
+
+    hot = weather_adjustment(HEAT_WAVE)
+    assert hot.water < mild.water and hot.fertilize > mild.fertilize
+
+    schedule = schedule_for(get_care_profile("Snake Plant")["Water"], NOW, hot, "Water")
+    assert schedule["next_due_at"] < NOW + timedelta(days=14)
+
+
+def test_stub_provider_is_deterministic():
+    provider = StubWeatherProvider()
+    first = asyncio.run(provider.get_conditions(["berlin", "austin"]))
+    assert first == asyncio.run(StubWeatherProvider().get_conditions(["berlin", "austin"]))
+
+    provider.set_conditions("austin", HEAT_WAVE)
+    assert asyncio.run(provider.get_conditions(["austin"]))["austin"] == HEAT_WAVE
+
+
+def test_heat_wave_updates_only_affected_region(tmp_path):
+    """A refresh rewrites only schedules in regions whose weather adjustment changed."""
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'care.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        provider = StubWeatherProvider()
+        care = CareScheduleEngine(async_sessionmaker(bind=engine, expire_on_commit=False), provider)
+
+        await care.add_plants([
+            {"user_id": "user123", "plant_name": "Snake Plant", "region": "austin"},
+            {"user_id": "user123", "plant_name": "Pothos", "region": "berlin"},
+            {"user_id": "user456", "plant_name": "Boston Fern", "region": "austin"},
+        ], now=NOW)
+        before = await care.get_schedule("user123")
+
+        unchanged = await care.refresh_weather(now=NOW)
+        provider.set_conditions("austin", HEAT_WAVE)
+        heat_wave = await care.refresh_weather(now=NOW)
+
+        after = await care.get_schedule("user123")
+        await engine.dispose()
+        return before, unchanged, heat_wave, after
+
+    before, unchanged, heat_wave, after = asyncio.run(main())
+    assert unchanged["schedules_updated"] == 0
+    # Two austin plants with two tasks each; the berlin plant is untouched
+    assert heat_wave["regions_changed"] == ["austin"]
+    assert heat_wave["schedules_updated"] == 4
+
+    due = lambda rows: {(row["plant_name"], row["task"]): row["next_due_at"] for row in rows}
+    before, after = due(before), due(after)
+    assert after[("Snake Plant", "Water")] < before[("Snake Plant", "Water")]
+    assert after[("Snake Plant", "Fertilize")] > before[("Snake Plant", "Fertilize")]
+    assert after[("Pothos", "Water")] == before[("Pothos", "Water")]
+
+
+def test_concurrent_adds_for_a_new_region(tmp_path):
+    """Plants added at the same time for an unseen region share one stored weather row."""
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'care.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        care = CareScheduleEngine(async_sessionmaker(bind=engine, expire_on_commit=False), StubWeatherProvider())
+
+        await asyncio.gather(
+            care.add_plants([{"user_id": "user123", "plant_name": "Pothos", "region": "lisbon"}], now=NOW),
+            care.add_plants([{"user_id": "user456", "plant_name": "Calathea", "region": "lisbon"}], now=NOW),
+            care.refresh_weather(now=NOW),
+        )
+        plants = await care.list_plants("user123") + await care.list_plants("user456")
+        await engine.dispose()
+        return plants
+
+    assert len(asyncio.run(main())) == 2
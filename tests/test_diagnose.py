@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Tests for the diagnosis caching layers.
+
+These tests exercise the in-process caches without calling OpenAI or Pinecone.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add the project root to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.diagnose.knowledge import ConditionKnowledgeCache, list_data_conditions
+from src.singleflight import AsyncSingleFlight, SingleFlight
+from src.diagnose.metrics import StageMetrics
+from src.diagnose.agent import stages
+from src.diagnose.agent.stages import estimate_tokens, fit_to_budget, get_stage_config, parse_stage_overrides
+from src.config import settings
+from src.diagnose.history import DiagnosisHistoryWriter, get_latest_by_image_hash, list_history
+from src.diagnose.capture import RequestCapture
+from src.diagnose.replay import compare, load_captured_records, percentile, schedule_offsets
+from src.database import Base
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+
+def test_knowledge_cache_reuses_entry_per_condition():
+    """The builder runs once per (plant, condition), regardless of formatting."""
+    calls = []
+
+    def builder(plant_name, condition):
+        calls.append((plant_name, condition))
+        return "context", "1. Prune affected leaves"
+
+    cache = ConditionKnowledgeCache(version_provider=lambda: "v1")
+    first = cache.get_or_build("Apple", "Rust", builder)
+    second = cache.get_or_build("apple ", "rust leaf", builder)
+
+    assert len(calls) == 1
+    assert second is first
+    assert second.base_action_plan == "1. Prune affected leaves"
+
+
+def test_knowledge_cache_keeps_unhealthy_apart_from_healthy():
+    """Conditions that merely contain the word 'healthy' get their own entries."""
+    key = ConditionKnowledgeCache.make_key
+    assert key("Apple", "Healthy leaf") == ("apple", "healthy")
+    assert key("Apple", "Unhealthy") != key("Apple", "healthy")
+    assert key("Apple", "Not Healthy") != key("Apple", "healthy")
+
+
+def test_knowledge_cache_invalidated_on_index_change():
+    """A new vector index version drops every cached entry."""
+    version = {"value": "v1"}
+    cache = ConditionKnowledgeCache(version_provider=lambda: version["value"])
+    cache.put("Corn", "Blight", "context", "plan")
+    assert cache.get("Corn", "Blight") is not None
+
+    version["value"] = "v2"
+    assert cache.get("Corn", "Blight") is None
+    assert len(cache) == 0
+
+
+def test_knowledge_cache_invalidated_by_writes_from_other_processes(tmp_path, monkeypatch):
+    """Ingestion in another process, or on another host, changes the version this service reports."""
+    from types import SimpleNamespace
+    from src.pinecone import ActiveIndex, PineconeService, write_version_file
+
+    version_file = str(tmp_path / "index_version")
+    monkeypatch.setattr(settings, "PINECONE_VERSION_FILE", version_file)
+    monkeypatch.setattr(settings, "PINECONE_STATS_CHECK_SECONDS", 60)
+    service = PineconeService()
+    cache = ConditionKnowledgeCache(version_provider=lambda: service.index_version)
+    cache.put("Corn", "Blight", "context", "plan")
+
+    # data/load.py adding documents rewrites the shared version file
+    write_version_file(version_file)
+    assert cache.get("Corn", "Blight") is None
+
+    # Writes that bypass the version file show up in the index's vector count
+    stats = SimpleNamespace(total_vector_count=10)
+    service._active = ActiveIndex("plant-diseases", "text-embedding-3-small", 1536,
+                                  SimpleNamespace(describe_index_stats=lambda: stats))
+    service._initialized = True
+    cache.put("Corn", "Blight", "context", "plan")
+    stats.total_vector_count = 12
+    assert cache.get("Corn", "Blight") is not None  # not re-checked until the interval passes
+    service._stats_checked_at = 0.0
+    assert cache.get("Corn", "Blight") is None
+
+
+def test_knowledge_cache_warm_from_data_dir():
+    """Warming builds one entry for each distinct condition in data/."""
+    conditions = list_data_conditions(DATA_DIR)
+    assert ("Apple", "Rust") in conditions
+    assert ("Tomato", "Early Blight") in conditions
+
+    cache = ConditionKnowledgeCache(version_provider=lambda: "v1")
+    built = cache.warm(lambda plant_name, condition: ("context", "plan"), DATA_DIR)
+
+    assert built == len(conditions)
+    assert cache.get("Tomato", "Early Blight") is not None
+
+
+def test_single_flight_coalesces_concurrent_threads():
+    """Concurrent callers with the same key share one execution."""
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def embed(text):
+        calls.append(text)
+        time.sleep(0.05)
+        return [0.1, 0.2]
+
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do(("embedding", "rust"), embed, "rust")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["rust"]
+    assert results == [[0.1, 0.2]] * 8
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_propagates_errors_and_does_not_cache():
+    """A failed flight raises for its callers and the next call runs again."""
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        flight.do("key", fail)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_async_single_flight_coalesces_identical_uploads():
+    """Identical image hashes awaiting at the same time share one workflow run."""
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def run_workflow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return '{"plant_name": "Tomato"}'
+
+    async def main():
+        return await asyncio.gather(*[
+            flight.do(("diagnosis", "abc123"), run_workflow) for _ in range(5)
+        ])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == ['{"plant_name": "Tomato"}'] * 5
+
+
+def test_stage_metrics_records_timings_and_tokens():
+    """Timings accumulate per stage and token totals sum across stages."""
+    metrics = StageMetrics()
+    with metrics.stage("diagnosis"):
+        pass
+    metrics.add_tokens("diagnosis", input_tokens=120, output_tokens=30)
+    metrics.add_tokens("parser", input_tokens=50, output_tokens=10, total_tokens=60)
+    metrics.finish()
+
+    assert "diagnosis" in metrics.timings
+    assert metrics.tokens["diagnosis"] == {"input": 120, "output": 30, "total": 150, "prompt": 0}
+    assert metrics.total_tokens == 210
+    duration = metrics.total_duration_ms
+    assert duration > 0
+    time.sleep(0.01)
+    assert metrics.total_duration_ms == duration
+
+
+def test_history_writer_batches_records(tmp_path):
+    """Buffered records are written on stop and served by the lookup queries."""
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'history.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        writer = DiagnosisHistoryWriter(session_factory, batch_size=10, flush_interval=60)
+        writer.start()
+        for i in range(3):
+            assert writer.enqueue({
+                "image_hash": f"hash-{i % 2}",
+                "object_key": f"{i}_leaf.jpg",
+                "plant_name": "Apple",
+                "condition": "Rust",
+                "result": {"plant_name": "Apple", "condition": "Rust"},
+                "stage_timings": {"diagnosis": 12.5},
+                "stage_tokens": {"diagnosis": {"input": 1, "output": 1, "total": 2}},
+                "total_duration_ms": 20.0,
+                "total_tokens": 2,
+            })
+        await writer.stop()
+
+        async with session_factory() as session:
+            history = await list_history(session, plant_name="Apple", condition="Rust")
+            latest = await get_latest_by_image_hash(session, "hash-0", max_age_seconds=3600)
+        await engine.dispose()
+        return history, latest
+
+    history, latest = asyncio.run(main())
+    assert len(history) == 3
+    assert latest is not None and latest.object_key == "2_leaf.jpg"
+
+
+def test_history_writer_stop_flushes_batch_in_progress(tmp_path):
+    """Records the loop has already taken off the queue are written on stop."""
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'history.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        writer = DiagnosisHistoryWriter(session_factory, batch_size=10, flush_interval=60)
+        writer.start()
+        for i in range(3):
+            writer.enqueue({"image_hash": f"hash-{i}", "result": {}})
+        # Let the loop take the batch and start waiting for it to fill
+        await asyncio.sleep(0.02)
+        await writer.stop()
+        accepted_after_stop = writer.enqueue({"image_hash": "late", "result": {}})
+
+        async with session_factory() as session:
+            history = await list_history(session)
+        await engine.dispose()
+        return history, accepted_after_stop
+
+    history, accepted_after_stop = asyncio.run(main())
+    assert len(history) == 3
+    assert not accepted_after_stop
+
+
+def test_request_capture_writes_jsonl(tmp_path):
+    """Captured records land as JSON lines readable by the replay tool."""
+    path = tmp_path / "captures" / "requests.jsonl"
+    capture = RequestCapture(str(path), max_bytes=1024 * 1024, backup_count=2)
+    capture.record({"received_at": 101.0, "object_key": "b_leaf.jpg", "duration_ms": 900.0, "outcome": "ok"})
+    capture.record({"received_at": 100.0, "object_key": "a_leaf.jpg", "duration_ms": 1200.0, "outcome": "ok"})
+    capture.stop()
+
+    records = load_captured_records([str(path)])
+    assert [record["object_key"] for record in records] == ["a_leaf.jpg", "b_leaf.jpg"]
+
+
+def test_replay_schedule_and_latency_comparison():
+    """Offsets follow original arrival gaps scaled by speed; comparisons report relative change."""
+    records = [{"received_at": 100.0}, {"received_at": 101.0}, {"received_at": 104.0}]
+    assert schedule_offsets(records, speed=2) == [0.0, 0.5, 2.0]
+    assert percentile([10, 20, 30, 40], 50) == 25
+
+    baseline = [{"status": 200, "latency_ms": 100.0}, {"status": 200, "latency_ms": 200.0}]
+    candidate = [{"status": 200, "latency_ms": 50.0}, {"status": 500, "latency_ms": 5.0}]
+    comparison = compare(baseline, candidate)
+    assert comparison["p50"]["baseline"] == 150.0
+    assert comparison["p50"]["candidate"] == 50.0
+    assert comparison["error_rate"]["candidate"] == 0.5
+
+
+def test_stage_config_overrides_and_context_budget(monkeypatch):
+    """Per-stage overrides apply on top of defaults, and long context is cut to budget."""
+    monkeypatch.setattr(stages, "STAGE_OVERRIDES", parse_stage_overrides('{"parser": {"model": "gpt-4.1-nano", "max_tokens": 800}}'))
+    parser = get_stage_config("parser")
+    assert parser.model == "gpt-4.1-nano"
+    assert parser.max_tokens == 800
+    assert parser.temperature == 0.0
+    assert get_stage_config("diagnosis").model == settings.LLM_DEFAULT_MODEL
+
+    context = "Leaves show orange lesions with yellow halos. " * 200
+    trimmed = fit_to_budget(context, 100)
+    assert estimate_tokens(trimmed) <= 105
+    assert trimmed.endswith("[truncated]")
+    assert fit_to_budget("short context", 100) == "short context"
+
+    metrics = StageMetrics()
+    metrics.record_prompt("diagnosis", trimmed)
+    assert metrics.tokens["diagnosis"]["prompt"] == estimate_tokens(trimmed)
+
+
+def test_invalid_stage_config_falls_back_to_defaults():
+    """Bad JSON drops all overrides; a bad field value drops only that stage's override."""
+    assert parse_stage_overrides("{not json") == {}
+    assert parse_stage_overrides('["parser"]') == {}
+    overrides = parse_stage_overrides('{"parser": {"max_tokens": "lots"}, "diagnosis": {"max_tokens": 900}, "security": 5}')
+    assert overrides == {"diagnosis": {"max_tokens": 900}}
@@ -7,6 +7,7 @@ This script tests the Pinecone service API compatibility without requiring a rea
 
 import os
 import sys
+from types import SimpleNamespace
 
 # Add the project root to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -47,5 +48,155 @@ def test_pinecone_service():
     
     print("\nPinecone service is ready for use with a valid API key!")
 
+def test_recall_at_k():
+    """Recall is the share of reference IDs found in the candidate results."""
+    from src.reindex import recall_at_k
+
+    assert recall_at_k(['a', 'b'], ['b', 'c']) == 0.5
+    assert recall_at_k(['a', 'b'], ['a', 'b']) == 1.0
+    assert recall_at_k([], ['a']) == 1.0
+
+def test_active_index_file_switches_reads(tmp_path, monkeypatch):
+    """A pointer written by the reindex tool switches the service to the new index."""
+    from src.config import settings
+    from src.pinecone import PineconeService, write_active_index_file
+
+    pointer = tmp_path / "active_index.json"
+    monkeypatch.setattr(settings, "PINECONE_ACTIVE_INDEX_FILE", str(pointer))
+    service = PineconeService()
+    version_before = service.index_version
+    assert service.dimension == settings.OPENAI_EMBEDDING_DIMENSIONS
+
+    write_active_index_file(str(pointer), "plant-diseases-512", "text-embedding-3-small", 512)
+    service._refresh_active_index()
+
+    assert service.index_name == "plant-diseases-512"
+    assert service.dimension == 512
+    assert service.index_version != version_before
+
+def test_existing_index_with_other_dimension_fails_loudly():
+    """An existing index built at another dimension is reported instead of queried with mismatched vectors."""
+    from src.pinecone import IndexDimensionMismatchError, PineconeService
+
+    service = PineconeService()
+    service.client = SimpleNamespace(
+        list_indexes=lambda: [SimpleNamespace(name="plant-diseases")],
+        describe_index=lambda name: SimpleNamespace(dimension=1536),
+    )
+    assert service.create_index_if_missing("plant-diseases", 1536) is False
+    try:
+        service.create_index_if_missing("plant-diseases", 512)
+    except IndexDimensionMismatchError as e:
+        assert "src.reindex --dimensions 512" in str(e)
+    else:
+        raise AssertionError("dimension mismatch was not detected")
+
+class FakeIndex:
+    """In-memory stand-in for a Pinecone index handle."""
+
+    def __init__(self, dimension, ids=()):
+        self.dimension = dimension
+        self.vectors = {}
+        for doc_id in ids:
+            self.upsert([{"id": doc_id, "values": [0.0] * dimension, "metadata": {"document": f"doc {doc_id}", "condition": "Rust"}}])
+        self.list_limit = None
+
+    def upsert(self, vectors):
+        for vector in vectors:
+            self.vectors[vector["id"]] = vector
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.vectors.pop(doc_id, None)
+
+    def fetch(self, ids):
+        return SimpleNamespace(vectors={
+            doc_id: SimpleNamespace(metadata=self.vectors[doc_id]["metadata"]) for doc_id in ids if doc_id in self.vectors
+        })
+
+    def list(self):
+        ids = sorted(self.vectors)[:self.list_limit]
+        if ids:
+            yield SimpleNamespace(vectors=[SimpleNamespace(id=doc_id) for doc_id in ids])
+
+    def query(self, vector, top_k, **kwargs):
+        return SimpleNamespace(matches=[SimpleNamespace(id=doc_id) for doc_id in sorted(self.vectors)[:top_k]])
+
+    def describe_index_stats(self):
+        return SimpleNamespace(total_vector_count=len(self.vectors))
+
+
+def make_reindex_service(tmp_path, monkeypatch, source_ids):
+    """A PineconeService over fake source and target indexes, wired into the reindex tool."""
+    from src import pinecone as pinecone_module, reindex as reindex_module
+    from src.config import settings
+    from src.pinecone import ActiveIndex, PineconeService
+
+    monkeypatch.setattr(settings, "PINECONE_ACTIVE_INDEX_FILE", str(tmp_path / "active_index.json"))
+    monkeypatch.setattr(settings, "PINECONE_VERSION_FILE", str(tmp_path / "index_version"))
+    indexes = {"plant-diseases": FakeIndex(1536, source_ids), "plant-diseases-512": FakeIndex(512)}
+    service = PineconeService()
+    service.client = SimpleNamespace(
+        list_indexes=lambda: [SimpleNamespace(name=name) for name in indexes],
+        describe_index=lambda name: SimpleNamespace(dimension=indexes[name].dimension),
+        Index=lambda name: indexes[name],
+    )
+    service._active = ActiveIndex("plant-diseases", "text-embedding-3-small", 1536, indexes["plant-diseases"])
+    service._initialized = True
+
+    fake_embeddings = lambda texts, model=None, dimensions=None: [[0.1] * dimensions for _ in texts]
+    monkeypatch.setattr(reindex_module, "pinecone_service", service)
+    monkeypatch.setattr(reindex_module, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(pinecone_module, "get_embedding", lambda text, model=None, dimensions=None: [0.1] * dimensions)
+    return service, indexes
+
+
+def test_reindex_refuses_to_switch_to_empty_or_incomplete_index(tmp_path, monkeypatch):
+    """An empty source, a truncated listing or a failed listing never switches reads."""
+    from src.reindex import reindex
+
+    service, indexes = make_reindex_service(tmp_path, monkeypatch, source_ids=[])
+    summary = reindex(dimensions=512)
+    assert summary["documents"] == 0 and summary["recall"] is None and not summary["switched"]
+
+    service, indexes = make_reindex_service(tmp_path, monkeypatch, source_ids=["a", "b", "c"])
+    indexes["plant-diseases"].list_limit = 2
+    summary = reindex(dimensions=512)
+    assert summary["target_vectors"] < summary["source_vectors"] and not summary["switched"]
+
+    def failing_list():
+        raise ConnectionError("listing failed")
+        yield
+    indexes["plant-diseases"].list = failing_list
+    try:
+        reindex(dimensions=512)
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("listing error was swallowed")
+    assert service.index_name == "plant-diseases"
+    assert service._shadow is None
+
+
+def test_reindex_keeps_documents_written_during_copy(tmp_path, monkeypatch):
+    """Writes through the service are mirrored, and writes that bypass it are caught by the final ID diff."""
+    from src import reindex as reindex_module
+
+    service, indexes = make_reindex_service(tmp_path, monkeypatch, source_ids=["a", "b", "c"])
+    copy_documents = reindex_module.copy_documents
+
+    def copy_while_loading(source, target, doc_ids, batch_size):
+        if doc_ids == ["a", "b", "c"]:
+            service.add_disease_info({"id": "d", "document": "doc d", "metadata": {"condition": "Rust"}})
+            indexes["plant-diseases"].upsert([{"id": "e", "values": [0.0] * 1536, "metadata": {"document": "doc e"}}])
+        return copy_documents(source, target, doc_ids, batch_size)
+
+    monkeypatch.setattr(reindex_module, "copy_documents", copy_while_loading)
+    summary = reindex_module.reindex(dimensions=512)
+
+    assert summary["switched"]
+    assert sorted(indexes["plant-diseases-512"].vectors) == ["a", "b", "c", "d", "e"]
+    assert service.index_name == "plant-diseases-512" and service._shadow is None
+
 if __name__ == "__main__":
     test_pinecone_service()
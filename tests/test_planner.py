@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the Green Space Planner recommendation engine.
+
+Scoring runs entirely on the in-memory catalog, so no API keys are needed.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+# Add the project root to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.planner.catalog import PlantCatalog, plant_catalog
+from src.planner.schemas import RecommendationRequest
+from src.planner.service import questionnaire_signature, rank_plants, recommend_plants
+
+
+def make_request(light, humidity, experience, style=""):
+    return RecommendationRequest(
+        environment={"light": light, "humidity": humidity},
+        experience=experience,
+        style=style,
+    )
+
+
+def test_recommends_top_three_viable_plants():
+    """Three plants are returned, and none of them is unsuited to the light level."""
+    recommendations = asyncio.run(recommend_plants(make_request("Low", "Medium", "Beginner", "Minimalist")))
+
+    assert len(recommendations) == 3
+    for recommendation in recommendations:
+        i = plant_catalog.names.index(recommendation.plant_name)
+        assert plant_catalog.light_fit[i, 0] > 0
+        assert recommendation.description
+
+
+def test_vectorized_top_k_matches_full_sort():
+    """argpartition-based top_k agrees with sorting every score."""
+    scores = plant_catalog.score("High", "Low", "Intermediate", ("desert",))
+    expected = [int(i) for i in np.argsort(-scores, kind="stable")[:3]]
+    assert plant_catalog.top_k(scores, 3) == expected
+
+
+def test_top_k_breaks_ties_at_cutoff_by_catalog_position():
+    """Plants tied at the k-th score are chosen by catalog position, not partition order."""
+    scores = np.array([0.5, 1.0, 0.9, 0.9, 0.9, 0.9, 0.2])
+    assert plant_catalog.top_k(scores, 3) == [1, 2, 3]
+
+    scores = plant_catalog.score("Medium", "High", "Experienced", ("classic",))
+    top = [plant_catalog.names[i] for i in plant_catalog.top_k(scores, 3)]
+    assert top == ["Boston Fern", "Maidenhair Fern", "Orchid (Phalaenopsis)"]
+
+
+def test_plants_that_cannot_thrive_are_excluded():
+    """A catalog with fewer viable plants than requested returns only the viable ones."""
+    catalog = PlantCatalog([
+        {"name": "Cactus", "light": (0.0, 0.5, 1.0), "humidity": (1.0, 0.5, 0.0), "difficulty": 1,
+         "styles": ("desert",), "description": "Sun lover."},
+        {"name": "Fern", "light": (0.5, 1.0, 0.2), "humidity": (0.0, 0.5, 1.0), "difficulty": 2,
+         "styles": ("classic",), "description": "Shade lover."},
+    ])
+    scores = catalog.score("Low", "High", "Beginner")
+    assert [catalog.names[i] for i in catalog.top_k(scores, 3)] == ["Fern"]
+
+
+def test_questionnaire_signature_is_cached():
+    """Equivalent questionnaires share a signature and a cached ranking."""
+    first = questionnaire_signature(make_request("High", "Medium", "Beginner", "Modern Minimalist"))
+    second = questionnaire_signature(make_request("High", "Medium", "Beginner", "minimalist, modern"))
+    assert first == second
+
+    rank_plants.cache_clear()
+    rank_plants(first)
+    rank_plants(second)
+    assert rank_plants.cache_info().hits == 1